@@ -1,11 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import gzip
+import importlib
+import shutil
 from pathlib import Path
 
-from timeline_combined_viewer import generate_combined_timeline
-from timeline_horizontal import generate_horizontal_timeline
-from timeline_vertical_filterable import generate_vertical_timeline
+
+# command -> (help text, default output path, generator module, generator function).
+# Generator modules are imported only for the command that runs: they pull in pandas,
+# which dominates CLI start-up time.
+_COMMANDS = {
+    "horizontal": (
+        "Generate horizontal timeline HTML.",
+        Path("timeline_horizontal.html"),
+        "timeline_horizontal",
+        "generate_horizontal_timeline",
+    ),
+    "vertical": (
+        "Generate vertical timeline HTML.",
+        Path("timeline_vertical_filterable.html"),
+        "timeline_vertical_filterable",
+        "generate_vertical_timeline",
+    ),
+    "combined": (
+        "Generate combined timeline viewer HTML.",
+        Path("timeline_combined.html"),
+        "timeline_combined_viewer",
+        "generate_combined_timeline",
+    ),
+}
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -15,54 +39,80 @@ def _build_parser() -> argparse.ArgumentParser:
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
-    horizontal = subparsers.add_parser("horizontal", help="Generate horizontal timeline HTML.")
-    horizontal.add_argument("-i", "--input", required=True, type=Path, help="Path to input Excel file.")
-    horizontal.add_argument(
-        "-o",
-        "--output",
-        type=Path,
-        default=Path("timeline_horizontal.html"),
-        help="Path to output HTML file.",
-    )
+    for name, (help_text, default_output, _, _) in _COMMANDS.items():
+        command = subparsers.add_parser(name, help=help_text)
+        command.add_argument("-i", "--input", required=True, type=Path, help="Path to input Excel file.")
+        command.add_argument(
+            "-o",
+            "--output",
+            type=Path,
+            default=default_output,
+            help="Path to output HTML file.",
+        )
+        command.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Also write a gzip-compressed copy next to the output (<output>.gz).",
+        )
+        command.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help="Skip regeneration when the input and generator code are unchanged since the last run.",
+        )
+    return parser
 
-    vertical = subparsers.add_parser("vertical", help="Generate vertical timeline HTML.")
-    vertical.add_argument("-i", "--input", required=True, type=Path, help="Path to input Excel file.")
-    vertical.add_argument(
-        "-o",
-        "--output",
-        type=Path,
-        default=Path("timeline_vertical_filterable.html"),
-        help="Path to output HTML file.",
-    )
 
-    combined = subparsers.add_parser("combined", help="Generate combined timeline viewer HTML.")
-    combined.add_argument("-i", "--input", required=True, type=Path, help="Path to input Excel file.")
-    combined.add_argument(
-        "-o",
-        "--output",
-        type=Path,
-        default=Path("timeline_combined.html"),
-        help="Path to output HTML file.",
-    )
-    return parser
+def _write_gzip_copy(path: Path) -> Path:
+    gz_path = path.with_name(path.name + ".gz")
+    with path.open("rb") as src, gzip.open(gz_path, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst, 1 << 20)
+    return gz_path
+
+
+def _stamp_key(command: str, input_path: Path, output: Path, gzip_copy: bool) -> str | None:
+    # Input identity plus the generator sources, so code edits also invalidate the stamp,
+    # plus the outputs themselves, so files rewritten by another run are not taken as current.
+    outputs = [output, output.with_name(output.name + ".gz")] if gzip_copy else [output]
+    if not all(path.exists() for path in outputs):
+        return None
+    parts = [command, str(input_path.resolve())]
+    for path in [input_path, *sorted(Path(__file__).parent.glob("timeline_*.py")), *outputs]:
+        stat = path.stat()
+        parts.append(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size}")
+    return "\n".join(parts)
 
 
 def main() -> int:
     parser = _build_parser()
     args = parser.parse_args()
 
-    if args.command == "horizontal":
-        generate_horizontal_timeline(args.input, args.output)
-        return 0
-    if args.command == "vertical":
-        generate_vertical_timeline(args.input, args.output)
-        return 0
-    if args.command == "combined":
-        generate_combined_timeline(args.input, args.output)
-        return 0
-
-    parser.error(f"Unknown command: {args.command}")
-    return 2
+    if args.command not in _COMMANDS:
+        parser.error(f"Unknown command: {args.command}")
+        return 2
+
+    stamp_path = args.output.with_name(args.output.name + ".stamp")
+    if args.skip_unchanged:
+        stamp_key = _stamp_key(args.command, args.input, args.output, args.gzip)
+        if (
+            stamp_key is not None
+            and stamp_path.exists()
+            and stamp_path.read_text(encoding="utf-8") == stamp_key
+        ):
+            print(f"Up to date: {args.output.resolve()}")
+            return 0
+
+    _, _, module_name, function_name = _COMMANDS[args.command]
+    generate = getattr(importlib.import_module(module_name), function_name)
+    generate(args.input, args.output)
+    if args.gzip:
+        gz_path = _write_gzip_copy(args.output)
+        print(f"Compressed copy saved to {gz_path.resolve()}")
+    if args.skip_unchanged:
+        stamp_key = _stamp_key(args.command, args.input, args.output, args.gzip)
+        stamp_path.write_text(stamp_key, encoding="utf-8")
+    elif stamp_path.exists():
+        stamp_path.unlink()
+    return 0
 
 
 if __name__ == "__main__":
@@ -1,28 +1,89 @@
 from __future__ import annotations
 
 import csv
+import html
+import re
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import datetime, timedelta, time as dt_time
+from functools import lru_cache
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable
 
-import html
+import numpy as np
 import pandas as pd
 
+try:
+    import python_calamine
+except ImportError:
+    python_calamine = None
+
+
+REQUIRED_COLUMNS: frozenset[str] = frozenset(
+    {
+        "Datum",
+        "Starttijd",
+        "Eindtijd",
+        "Zekerheid (ja/nee)",
+        "Entiteit(en) (splits op met |)",
+        "Gebeurtenis",
+        "Geverifieerd",
+    }
+)
+_USED_COLUMNS = REQUIRED_COLUMNS | {"Bron"}
+# Free-text columns are read as strings directly instead of being type-inferred.
+_TEXT_COLUMN_DTYPES = {
+    "Zekerheid (ja/nee)": "string",
+    "Entiteit(en) (splits op met |)": "string",
+    "Gebeurtenis": "string",
+    "Geverifieerd": "string",
+    "Bron": "string",
+}
 
-REQUIRED_COLUMNS = {
-    "Datum",
-    "Starttijd",
-    "Eindtijd",
-    "Zekerheid (ja/nee)",
-    "Entiteit(en) (splits op met |)",
-    "Gebeurtenis",
-    "Geverifieerd",
+# pandas reads workbooks through python-calamine (engine="calamine") from 2.2 on,
+# several times faster than openpyxl; None keeps pandas' default engine.
+_PANDAS_VERSION = tuple(int(part) for part in pd.__version__.split(".")[:2])
+
+_EXCEL_ENGINE = "calamine" if python_calamine is not None and _PANDAS_VERSION >= (2, 2) else None
+
+# format="mixed" (pandas 2.0+) parses each value on its own; older pandas already
+# does that when no format is given.
+_MIXED_DATES = {"format": "mixed"} if _PANDAS_VERSION >= (2, 0) else {}
+
+_TRUE_VALUES = frozenset({"ja"})
+_WEB_LINK_RE = re.compile(r"\s*(?:https?://|www\.)", re.IGNORECASE)
+# "HH:MM" for every minute of the day; the trailing None stands in for NaT.
+_CLOCK_LABELS = np.array(
+    [f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)] + [None],
+    dtype=object,
+)
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# Cell type -> how parse_date_time and _time_of_day interpret a time cell.
+_TIME_KINDS = {
+    dt_time: "time",
+    datetime: "stamp",
+    pd.Timestamp: "stamp",
+    int: "serial",
+    float: "serial",
 }
 
 
-@dataclass
+@dataclass(frozen=True)
 class TimelineEvent:
+    # Explicit __slots__ rather than dataclass(slots=True), which needs Python 3.10.
+    __slots__ = (
+        "event_id",
+        "description",
+        "entities",
+        "date_label",
+        "time_label",
+        "start_dt",
+        "end_dt",
+        "certain",
+        "verified",
+        "sources",
+    )
+
     event_id: int
     description: str
     entities: list[str]
@@ -34,48 +95,101 @@ class TimelineEvent:
     verified: bool
     sources: list[str]
 
+    # Frozen instances reject the default slot-by-slot setattr used by pickle and copy;
+    # dataclass(slots=True) generates the same pair.
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state: tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            object.__setattr__(self, name, value)
+
+
+def _optional_datetimes(values: np.ndarray) -> list[datetime | None]:
+    missing = np.isnat(values).tolist()
+    stamps = pd.DatetimeIndex(values).to_pydatetime()
+    return [None if is_missing else stamp for stamp, is_missing in zip(stamps, missing)]
+
+
+def _is_null(value: object) -> bool:
+    # Scalar stand-in for pd.isna covering the missing-value markers that
+    # read_excel produces: None, NaN, NaT and pd.NA.
+    return (
+        value is None
+        or value is pd.NaT
+        or value is pd.NA
+        or (isinstance(value, float) and value != value)
+    )
+
 
 def normalize_bool(value: object) -> bool:
-    if value is None or pd.isna(value):
+    if _is_null(value):
         return False
-    return str(value).strip().lower() == "ja"
+    return str(value).strip().lower() in _TRUE_VALUES
 
 
-def parse_date_time(date_value: object, time_value: object) -> datetime | None:
-    if date_value is None or pd.isna(date_value):
+def _time_kind(value: object) -> str | None:
+    if _is_null(value):
         return None
+    kind = _TIME_KINDS.get(type(value))
+    if kind is None:
+        # Subclasses (numpy scalars, bool, ...) fall back to an isinstance scan.
+        kind = next((k for t, k in _TIME_KINDS.items() if isinstance(value, t)), "text")
+    return kind
 
-    date_ts = pd.to_datetime(date_value, errors="coerce")
-    if pd.isna(date_ts):
-        return None
-    date_ts = date_ts.normalize()
 
-    if time_value is None or pd.isna(time_value):
-        return date_ts.to_pydatetime()
+def _combine_time(date_ts: pd.Timestamp, time_value: dt_time) -> datetime:
+    return datetime.combine(date_ts.date(), time_value)
 
-    if isinstance(time_value, dt_time):
-        return datetime.combine(date_ts.date(), time_value)
 
-    if isinstance(time_value, (pd.Timestamp, datetime)):
-        return datetime.combine(date_ts.date(), pd.to_datetime(time_value).time())
+def _combine_stamp(date_ts: pd.Timestamp, time_value: datetime) -> datetime:
+    return datetime.combine(date_ts.date(), pd.to_datetime(time_value).time())
 
-    if isinstance(time_value, (int, float)) and not pd.isna(time_value):
-        t = pd.to_datetime(time_value, unit="D", origin="1899-12-30", errors="coerce")
-        if pd.isna(t):
-            return date_ts.to_pydatetime()
-        return datetime.combine(date_ts.date(), t.time())
 
+def _combine_serial(date_ts: pd.Timestamp, time_value: float) -> datetime:
+    # Excel stores times as fractions of a day since 1899-12-30.
+    try:
+        t = _EXCEL_EPOCH + timedelta(days=time_value)
+    except (OverflowError, ValueError):
+        return date_ts.to_pydatetime()
+    return datetime.combine(date_ts.date(), t.time())
+
+
+def _combine_text(date_ts: pd.Timestamp, time_value: object) -> datetime:
     t = pd.to_datetime(str(time_value).strip(), errors="coerce")
-    if pd.isna(t):
+    if t is pd.NaT:
         return date_ts.to_pydatetime()
     return datetime.combine(date_ts.date(), t.time())
 
 
+_TIME_HANDLERS = {
+    "time": _combine_time,
+    "stamp": _combine_stamp,
+    "serial": _combine_serial,
+    "text": _combine_text,
+}
+
+
+def parse_date_time(date_value: object, time_value: object) -> datetime | None:
+    if _is_null(date_value):
+        return None
+
+    date_ts = pd.to_datetime(date_value, errors="coerce")
+    if date_ts is pd.NaT:
+        return None
+    date_ts = date_ts.normalize()
+
+    kind = _time_kind(time_value)
+    if kind is None:
+        return date_ts.to_pydatetime()
+    return _TIME_HANDLERS[kind](date_ts, time_value)
+
+
 def format_date_label(date_value: object) -> str:
-    if date_value is None or pd.isna(date_value):
+    if _is_null(date_value):
         return "Onbekende datum"
     date = pd.to_datetime(date_value, errors="coerce")
-    if pd.isna(date):
+    if date is pd.NaT:
         return "Onbekende datum"
     return date.strftime("%Y-%m-%d")
 
@@ -98,18 +212,21 @@ def normalize_end_dt(start_dt: datetime | None, end_dt: datetime | None) -> date
 
 
 def split_entities(value: object) -> list[str]:
-    if value is None or pd.isna(value):
+    if _is_null(value):
         return ["Onbekend"]
     entities = [item.strip() for item in str(value).split("|") if item.strip()]
     return entities or ["Onbekend"]
 
 
 def split_sources(value: object) -> list[str]:
-    if value is None or pd.isna(value):
+    if _is_null(value):
         return []
     raw = str(value).strip()
     if not raw:
         return []
+    if '"' not in raw:
+        # Without quotes the csv reader would split exactly like str.split.
+        return [item for item in (part.strip() for part in raw.split("|")) if item]
     try:
         parts = next(csv.reader([raw], delimiter="|", quotechar='"', skipinitialspace=True))
     except Exception:
@@ -125,41 +242,46 @@ def split_sources(value: object) -> list[str]:
 
 
 def is_web_link(source: str) -> bool:
-    lower = source.strip().lower()
-    return lower.startswith("http://") or lower.startswith("https://") or lower.startswith("www.")
+    return _WEB_LINK_RE.match(source) is not None
 
 
 def normalize_href(source: str) -> str:
     s = source.strip()
-    if s.lower().startswith("www."):
+    if s[:4].lower() == "www.":
         return f"https://{s}"
     return s
 
 
+def escape_html(text: str) -> str:
+    # html.escape's chain of str.replace calls is several times faster than a
+    # str.translate table, and also beats escaping all texts joined in one pass.
+    return html.escape(text, quote=True)
+
+
+@lru_cache(maxsize=4096)
+def _source_item_html(src: str) -> str:
+    # Sources repeat across many events, so each distinct one is escaped once.
+    full = escape_html(src)
+    if is_web_link(src):
+        href = escape_html(normalize_href(src))
+        return (
+            "<a class='source-link' "
+            f"href='{href}' target='_blank' rel='noopener noreferrer' title='{full}'>"
+            "<span class='source-icon source-icon-link' aria-hidden='true'></span>"
+            "</a>"
+        )
+    return (
+        "<button class='source-copy' type='button' "
+        f"data-copy-source='{full}' title='{full}'>"
+        "<span class='source-icon source-icon-file' aria-hidden='true'></span>"
+        "</button>"
+    )
+
+
 def render_sources_html(sources: list[str]) -> str:
     if not sources:
         return ""
-    items: list[str] = []
-    for src in sources:
-        full = html.escape(src, quote=True)
-        if is_web_link(src):
-            href = html.escape(normalize_href(src), quote=True)
-            items.append(
-                "<a class='source-link' "
-                f"href='{href}' target='_blank' rel='noopener noreferrer' title='{full}'>"
-                "<span class='source-icon source-icon-link' aria-hidden='true'></span>"
-                "</a>"
-            )
-            continue
-
-        data_value = html.escape(src, quote=True)
-        items.append(
-            "<button class='source-copy' type='button' "
-            f"data-copy-source='{data_value}' title='{full}'>"
-            "<span class='source-icon source-icon-file' aria-hidden='true'></span>"
-            "</button>"
-        )
-    return "<div class='card-sources'>" + "".join(items) + "</div>"
+    return "<div class='card-sources'>" + "".join(map(_source_item_html, sources)) + "</div>"
 
 
 def is_range(event: TimelineEvent) -> bool:
@@ -179,11 +301,19 @@ def effective_end_dt(event: TimelineEvent) -> datetime:
 
 
 def sorted_events(events: Iterable[TimelineEvent]) -> list[TimelineEvent]:
-    def sort_key(event: TimelineEvent) -> tuple:
-        is_instant = not is_range(event)
-        return (event.start_dt is None, event.start_dt or datetime.max, is_instant, event.event_id)
-
-    return sorted(events, key=sort_key)
+    events = list(events)
+    # Build all sort keys in one pass (is_range inlined), then sort positions.
+    keys = [
+        (
+            e.start_dt is None,
+            e.start_dt or datetime.max,
+            e.start_dt is None or e.end_dt is None or e.end_dt == e.start_dt,
+            e.event_id,
+        )
+        for e in events
+    ]
+    order = sorted(range(len(events)), key=keys.__getitem__)
+    return [events[i] for i in order]
 
 
 def truncate(text: str, n: int = 120) -> str:
@@ -191,64 +321,187 @@ def truncate(text: str, n: int = 120) -> str:
     return text if len(text) <= n else text[: n - 1] + "..."
 
 
-def estimate_card_width(text: str, is_range_event: bool) -> int:
-    base_width = 140 + int(len(text) * 5)
-    min_width = 180
-    max_width = 320
-    width = max(min_width, min(base_width, max_width))
-    return width if not is_range_event else max(width, min_width)
+def estimate_card_width(text: str) -> int:
+    # 140px base + 5px per character, clamped to [180, 320].
+    return min(320, max(180, 140 + len(text) * 5))
+
+
+def estimate_card_widths(text_lengths: np.ndarray) -> np.ndarray:
+    # Vectorized estimate_card_width over an array of text lengths.
+    return np.clip(140 + np.asarray(text_lengths, dtype=np.int64) * 5, 180, 320)
+
+
+# Entity colours only vary by integer hue, so all 360 strings are built once.
+_HUE_COLORS = tuple(f"hsl({hue}, 60%, 68%)" for hue in range(360))
 
 
 def build_entity_colors(entities: list[str]) -> dict[str, str]:
-    ordered: list[str] = []
-    seen: set[str] = set()
-    for entity in sorted(entities, key=lambda s: s.casefold()):
-        if entity not in seen:
-            seen.add(entity)
-            ordered.append(entity)
+    ordered = list(dict.fromkeys(sorted(entities, key=str.casefold)))
 
     base_hue = 24.0
     golden_angle = 137.508
-    colors: dict[str, str] = {}
-    for index, entity in enumerate(ordered):
-        hue = int((base_hue + (index * golden_angle)) % 360)
-        colors[entity] = f"hsl({hue}, 60%, 68%)"
-    return colors
+    hues = ((base_hue + np.arange(len(ordered)) * golden_angle) % 360).astype(np.int64)
+    return dict(zip(ordered, map(_HUE_COLORS.__getitem__, hues.tolist())))
+
+
+def _clock_offsets(stamps: pd.Series) -> pd.Series:
+    return stamps - stamps.dt.normalize()
+
+
+def _serial_offsets(values: pd.Series) -> pd.Series:
+    serials = pd.to_datetime(values, unit="D", origin="1899-12-30", errors="coerce")
+    # Round like timedelta(days=...) does: float days such as 1/1440 otherwise
+    # land a few nanoseconds short of the intended minute.
+    return _clock_offsets(serials).dt.round("us")
+
+
+def _wall_clock_offsets(times: pd.Series) -> pd.Series:
+    # datetime.time cells to offsets from their fields directly, rather than
+    # formatting each one as text and parsing it back with to_timedelta.
+    micros = np.fromiter(
+        (
+            (t.hour * 3600 + t.minute * 60 + t.second) * 1_000_000 + t.microsecond
+            for t in times
+        ),
+        dtype=np.int64,
+        count=len(times),
+    )
+    return pd.Series(micros.astype("timedelta64[us]"), index=times.index)
+
+
+def _time_of_day(values: pd.Series) -> pd.Series:
+    # Vectorized counterpart of the time handling in parse_date_time: one
+    # conversion per kind of cell instead of one per row. NaT marks cells
+    # that are empty or could not be parsed.
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return _clock_offsets(values)
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return _serial_offsets(values)
+
+    offsets = pd.Series(pd.NaT, index=values.index, dtype="timedelta64[ns]")
+    kinds = values.map(_time_kind)
+
+    mask = kinds == "time"
+    if mask.any():
+        offsets[mask] = _wall_clock_offsets(values[mask])
+    mask = kinds == "stamp"
+    if mask.any():
+        offsets[mask] = _clock_offsets(pd.to_datetime(values[mask]))
+    mask = kinds == "serial"
+    if mask.any():
+        offsets[mask] = _serial_offsets(values[mask].astype(float))
+    mask = kinds == "text"
+    if mask.any():
+        parsed = pd.to_datetime(
+            values[mask].astype(str).str.strip(), errors="coerce", **_MIXED_DATES
+        )
+        offsets[mask] = _clock_offsets(parsed)
+    return offsets.dt.floor("us")
 
 
-def read_events_from_excel(excel_path: str | Path) -> list[TimelineEvent]:
-    df = pd.read_excel(excel_path)
-    missing = REQUIRED_COLUMNS.difference(df.columns)
+def _bool_column(values: pd.Series) -> list[bool]:
+    text = values.astype("string").str.strip().str.lower()
+    return text.isin(_TRUE_VALUES).tolist()
+
+
+def _read_df(excel_path: str | Path) -> pd.DataFrame:
+    df = pd.read_excel(
+        excel_path,
+        usecols=lambda column: column in _USED_COLUMNS,
+        dtype=_TEXT_COLUMN_DTYPES,
+        engine=_EXCEL_ENGINE,
+    )
+    missing = REQUIRED_COLUMNS - set(df.columns)
     if missing:
         raise ValueError(f"Missing columns in Excel file: {', '.join(sorted(missing))}")
-
-    events: list[TimelineEvent] = []
-    for idx, row in df.iterrows():
-        start_dt = parse_date_time(row["Datum"], row["Starttijd"])
-        end_dt = parse_date_time(row["Datum"], row["Eindtijd"]) if not pd.isna(row["Eindtijd"]) else None
-        end_dt = normalize_end_dt(start_dt, end_dt)
-        description = str(row["Gebeurtenis"]) if not pd.isna(row["Gebeurtenis"]) else ""
-
-        events.append(
-            TimelineEvent(
-                event_id=int(idx),
-                description=description,
-                entities=split_entities(row["Entiteit(en) (splits op met |)"]),
-                date_label=format_date_label(row["Datum"]),
-                time_label=format_time_label(start_dt, end_dt),
-                start_dt=start_dt,
-                end_dt=end_dt if (start_dt and end_dt) else None,
-                certain=normalize_bool(row["Zekerheid (ja/nee)"]),
-                verified=normalize_bool(row["Geverifieerd"]),
-                sources=split_sources(row["Bron"]) if "Bron" in df.columns else [],
-            )
+    return df
+
+
+def _date_labels(dates: pd.Series) -> pd.Series:
+    # Same as dates.dt.strftime("%Y-%m-%d"), formatting each distinct day once.
+    codes, days = pd.factorize(dates)
+    table = np.array(days.strftime("%Y-%m-%d").tolist() + [None], dtype=object)
+    return pd.Series(table[codes], index=dates.index, dtype=object)
+
+
+def _clock_labels(stamps: pd.Series) -> pd.Series:
+    # Same as stamps.dt.strftime("%H:%M"), looked up by minute of the day.
+    minutes = (_clock_offsets(stamps) // pd.Timedelta(minutes=1)).fillna(-1).astype(np.int64)
+    return pd.Series(_CLOCK_LABELS[minutes.to_numpy()], index=stamps.index, dtype=object)
+
+
+def _split_column(column: pd.Series, split: Callable[[object], list[str]]) -> list[list[str]]:
+    # Entity/source cells repeat heavily, so split each distinct value once and
+    # hand every row its own copy of the result. Comparing as text keeps e.g. 1
+    # and 1.0 apart; missing cells get code -1, which indexes the trailing
+    # split(None) entry.
+    codes, uniques = pd.factorize(column.astype("string"))
+    table = [split(value) for value in uniques.tolist()]
+    table.append(split(None))
+    return [table[code].copy() for code in codes.tolist()]
+
+
+def events_from_df(df: pd.DataFrame) -> list[TimelineEvent]:
+    dates = pd.to_datetime(df["Datum"], errors="coerce", **_MIXED_DATES).dt.normalize()
+    zero = pd.Timedelta(0)
+    starts = dates + _time_of_day(df["Starttijd"]).fillna(zero)
+    ends = (dates + _time_of_day(df["Eindtijd"]).fillna(zero)).where(df["Eindtijd"].notna())
+    ends = ends.where(~(ends < starts), ends + pd.Timedelta(days=1))
+
+    date_labels = _date_labels(dates).fillna("Onbekende datum")
+    start_labels = _clock_labels(starts)
+    has_span = ends.notna() & ends.ne(starts)
+    time_labels = start_labels.where(
+        ~has_span, start_labels + " - " + _clock_labels(ends)
+    ).fillna("Onbekende tijd")
+
+    gebeurtenis = df["Gebeurtenis"]
+    descriptions = gebeurtenis.astype(str).where(gebeurtenis.notna(), "")
+    entities = _split_column(df["Entiteit(en) (splits op met |)"], split_entities)
+    if "Bron" in df.columns:
+        sources = _split_column(df["Bron"], split_sources)
+    else:
+        sources = [[] for _ in range(len(df))]
+
+    # Columns zipped positionally in TimelineEvent field order; tolist() turns the
+    # numpy columns into Python ints/bools in one C pass.
+    return list(
+        map(
+            TimelineEvent,
+            df.index.to_numpy(dtype=np.int64).tolist(),
+            descriptions.tolist(),
+            entities,
+            date_labels.tolist(),
+            time_labels.tolist(),
+            _optional_datetimes(starts.to_numpy()),
+            _optional_datetimes(ends.where(starts.notna()).to_numpy()),
+            _bool_column(df["Zekerheid (ja/nee)"]),
+            _bool_column(df["Geverifieerd"]),
+            sources,
         )
-    return events
+    )
+
+
+def read_events_from_excel(excel_path: str | Path) -> list[TimelineEvent]:
+    return events_from_df(_read_df(excel_path))
 
 
 def group_events_by_entity(events: Iterable[TimelineEvent]) -> dict[str, list[TimelineEvent]]:
-    entity_events: dict[str, list[TimelineEvent]] = {}
+    entity_events: defaultdict[str, list[TimelineEvent]] = defaultdict(list)
     for event in events:
         for entity in event.entities:
-            entity_events.setdefault(entity, []).append(event)
-    return entity_events
+            entity_events[entity].append(event)
+    return dict(entity_events)
+
+
+def write_html_lines(output_path: Path, lines: Iterable[str]) -> None:
+    # Equivalent to output_path.write_text("\n".join(lines)), but streamed through
+    # a large write buffer so the whole document is never held in memory.
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8", buffering=1 << 20) as f:
+        write = f.write
+        separator = ""
+        for line in lines:
+            write(separator)
+            write(line)
+            separator = "\n"
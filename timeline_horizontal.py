@@ -2,673 +2,734 @@
 from __future__ import annotations
 from datetime import datetime
 from pathlib import Path
-import html
+import heapq
+from operator import attrgetter
+from typing import Iterator
+
+import numpy as np
 from timeline_core import (
     TimelineEvent,
     build_entity_colors,
-    estimate_card_width,
-    group_events_by_entity,
+    escape_html,
+    estimate_card_widths,
     is_range,
-    overlaps,
     read_events_from_excel,
     render_sources_html,
     sorted_events,
     truncate,
+    write_html_lines,
+)
+
+# Static page chrome, built once at import time.
+_CSS_BLOCK = """\
+body { font-family: 'Segoe UI', sans-serif; margin: 20px; }
+#minimap {
+  position: fixed;
+  right: 18px;
+  bottom: 18px;
+  width: 260px;
+  height: 180px;
+  background: rgba(255,255,255,0.92);
+  border: 2px solid #2f3e46;
+  border-radius: 12px;
+  box-shadow: 0 8px 24px rgba(0,0,0,0.12);
+  z-index: 999;
+  display: flex;
+  flex-direction: column;
+  overflow: hidden;
+}
+#minimap-title {
+  font-size: 12px;
+  font-weight: 600;
+  padding: 6px 10px;
+  border-bottom: 1px solid rgba(47,62,70,0.25);
+}
+#minimap-canvas {
+  width: 100%;
+  height: 100%;
+  display: block;
+  cursor: pointer;
+}
+:root { --label-w: 220px; --label-gap: 16px; }
+.timeline-scroller {
+  overflow-x: auto;
+  overflow-y: visible;
+  position: relative;
+  padding-bottom: 10px;
+}
+.timeline {
+  display: flex;
+  flex-direction: column;
+  gap: 5px;
+  min-width: fit-content;
+}
+.entity {
+  position: relative;
+  border-left: 6px solid var(--entity-color, #2f3e46);
+  padding-left: calc(var(--label-w) + var(--label-gap));
+}
+.entity-title {
+  position: sticky;
+  left: 0;
+  z-index: 100;
+  width: var(--label-w);
+  margin-left: calc(-1 * (var(--label-w) + var(--label-gap)));
+  font-weight: 600;
+  background: white;
+  padding: 4px 10px;
+  border-radius: 10px;
+  border: 2px solid var(--entity-color, #2f3e46);
+  white-space: nowrap;
+  margin-bottom: 12px;
+}
+.subrow {
+  position: relative;
+  height: 95px;
+  margin-bottom: 2px;
+}
+.card {
+  position: absolute;
+  height: 90px;
+  padding: 8px 10px 34px 10px;
+  border: 2px solid #2f3e46;
+  border-left: 8px solid var(--entity-color, #2f3e46);
+  border-radius: 10px;
+  background: #f9fbfb;
+  box-sizing: border-box;
+  overflow: hidden;
+  cursor: pointer;
+}
+.card:hover {
+  overflow: visible;
+  z-index: 200;
+}
+.card.expanded {
+  height: auto !important;
+  min-height: 90px;
+  padding-bottom: 10px;
+  overflow: visible;
+  z-index: 1500;
+  box-shadow: 0 10px 26px rgba(0,0,0,0.16);
+}
+.card.expanded .card-body {
+  max-height: none;
+  overflow: visible;
+  padding-right: 0;
+}
+.card.expanded .card-body::after {
+  display: none;
+}
+.card.expanded .card-sources {
+  position: static;
+  margin-top: 8px;
+}
+.card-header {
+  font-weight: 600;
+  margin-bottom: 4px;
+  font-size: 12px;
+}
+.card-body {
+  line-height: 1.2;
+  margin-bottom: 0;
+  max-height: 42px;
+  overflow: hidden;
+  position: relative;
+  padding-right: 34px;
+}
+.card-body.has-more::after, .card-body.truncated::after {
+  content: '?';
+  position: absolute;
+  right: 0;
+  bottom: 24px;
+  width: 16px;
+  text-align: right;
+  font-size: 14px;
+  font-weight: 700;
+  color: rgba(47,62,70,0.78);
+  background: linear-gradient(90deg, rgba(249,251,251,0), rgba(249,251,251,0.97) 48%);
+}
+.card-sources {
+  position: absolute;
+  right: 8px;
+  bottom: 6px;
+  display: flex;
+  gap: 6px;
+  align-items: center;
+}
+.source-link, .source-copy {
+  width: 22px;
+  height: 22px;
+  border: 1px solid rgba(47,62,70,0.35);
+  border-radius: 6px;
+  background: #fff;
+  display: inline-flex;
+  align-items: center;
+  justify-content: center;
+  cursor: pointer;
+  padding: 0;
+  text-decoration: none;
+}
+.source-link:hover, .source-copy:hover {
+  background: rgba(47,62,70,0.08);
+}
+.source-icon {
+  width: 12px;
+  height: 12px;
+  position: relative;
+  display: inline-block;
+}
+.source-icon-link::before {
+  content: '';
+  position: absolute;
+  width: 8px;
+  height: 8px;
+  right: 1px;
+  top: 1px;
+  border-top: 2px solid #2f3e46;
+  border-right: 2px solid #2f3e46;
+}
+.source-icon-link::after {
+  content: '';
+  position: absolute;
+  width: 7px;
+  height: 2px;
+  left: 1px;
+  bottom: 2px;
+  background: #2f3e46;
+  transform: rotate(-45deg);
+  transform-origin: left center;
+}
+.source-icon-file::before {
+  content: '';
+  position: absolute;
+  left: 1px;
+  top: 1px;
+  width: 8px;
+  height: 10px;
+  border: 2px solid #2f3e46;
+  border-radius: 2px;
+}
+.source-icon-file::after {
+  content: '';
+  position: absolute;
+  right: 1px;
+  top: 2px;
+  width: 4px;
+  height: 4px;
+  border-top: 2px solid #2f3e46;
+  border-right: 2px solid #2f3e46;
+}
+.source-copy.copied {
+  background: #dfeff2;
+}
+.tooltip {
+  display: none;
+  position: fixed;
+  left: 0;
+  top: 0;
+  max-width: 520px;
+  max-height: min(60vh, 420px);
+  overflow: auto;
+  padding: 10px 12px;
+  border: 2px solid #2f3e46;
+  border-radius: 10px;
+  background: #ffffff;
+  box-shadow: 0 6px 18px rgba(0,0,0,0.12);
+  font-size: 13px;
+  line-height: 1.3;
+  pointer-events: none;
+  z-index: 2000;
+}
+.legend {
+  margin-bottom: 20px;
+  display: flex;
+  gap: 20px;
+  font-size: 12px;
+}
+.legend-item {
+  display: flex;
+  align-items: center;
+  gap: 6px;
+}
+.legend-box {
+  width: 18px;
+  height: 12px;
+  border: 2px solid #2f3e46;
+  border-radius: 4px;
+}
+.legend-box.uncertain {
+  border-style: dashed;
+}
+.legend-box.unverified {
+  border-style: dotted;
+  border-color: #9aa0a6;
+  background: #f2f3f5;
+}"""
+
+_JS_BLOCK = """\
+(function(){
+  document.addEventListener('click', async (e) => {
+    const btn = e.target.closest('.source-copy[data-copy-source]');
+    if (!btn) return;
+    const value = btn.getAttribute('data-copy-source') || '';
+    try {
+      await navigator.clipboard.writeText(value);
+      btn.classList.add('copied');
+      window.setTimeout(() => btn.classList.remove('copied'), 500);
+    } catch (_) {}
+  });
+  function updateBodyOverflowCues(){
+    const bodies = document.querySelectorAll('.card-body');
+    for (const body of bodies) {
+      const clipped = (body.scrollHeight - body.clientHeight) > 1;
+      body.classList.toggle('truncated', clipped);
+    }
+  }
+  function initCardExpansion(){
+    const cards = document.querySelectorAll('.card[data-event="1"]');
+    let activeCard = null;
+    function setBodyText(card, useFull){
+      const body = card.querySelector('.card-body');
+      if (!body) return;
+      body.textContent = useFull ? (body.dataset.fullText || body.textContent || '') : (body.dataset.shortText || body.textContent || '');
+    }
+    function collapseActive(){
+      if (!activeCard) return;
+      setBodyText(activeCard, false);
+      activeCard.classList.remove('expanded');
+      activeCard = null;
+      updateBodyOverflowCues();
+      requestRedraw(true);
+    }
+    for (const card of cards) {
+      card.addEventListener('click', (e) => {
+        if (e.target.closest('.source-link, .source-copy')) return;
+        e.stopPropagation();
+        if (activeCard === card) { collapseActive(); return; }
+        collapseActive();
+        setBodyText(card, true);
+        card.classList.add('expanded');
+        activeCard = card;
+        updateBodyOverflowCues();
+        requestRedraw(true);
+      });
+    }
+    document.addEventListener('click', (e) => {
+      if (!activeCard) return;
+      if (e.target.closest('.card[data-event="1"]')) return;
+      collapseActive();
+    });
+  }
+  const scroller = document.querySelector('.timeline-scroller');
+  const timeline = document.querySelector('.timeline');
+  const canvas = document.getElementById('minimap-canvas');
+  const box = document.getElementById('minimap');
+  if (!scroller || !timeline || !canvas || !box) return;
+  initCardExpansion();
+  const ctx = canvas.getContext('2d');
+  let dragging = false;
+  let needsRedraw = true;
+  let frameRequested = false;
+  // Card rectangles are measured once (in timeline content coordinates) and painted
+  // into an offscreen layer; scrolling only blits that layer and moves the viewport box.
+  let cardLayer = null;
+  function clamp(v, lo, hi) { return Math.max(lo, Math.min(hi, v)); }
+  function layoutCanvas(){
+    const dpr = window.devicePixelRatio || 1;
+    const rect = canvas.getBoundingClientRect();
+    const w = Math.max(1, Math.floor(rect.width * dpr));
+    const h = Math.max(1, Math.floor(rect.height * dpr));
+    if (canvas.width !== w || canvas.height !== h) {
+      canvas.width = w; canvas.height = h;
+      needsRedraw = true;
+    }
+  }
+  function getTimelineTop(){
+    const r = timeline.getBoundingClientRect();
+    return r.top + window.scrollY;
+  }
+  function measureCards(){
+    const scrollerRect = scroller.getBoundingClientRect();
+    const timelineTop = getTimelineTop();
+    const cards = timeline.querySelectorAll('.card[data-event="1"]');
+    return Array.from(cards, (card) => {
+      const r = card.getBoundingClientRect();
+      return {
+        x: (r.left - scrollerRect.left) + scroller.scrollLeft,
+        y: (r.top + window.scrollY) - timelineTop,
+        w: r.width,
+        h: r.height,
+        color: getComputedStyle(card).getPropertyValue('--entity-color').trim() || '#2f3e46',
+      };
+    });
+  }
+  function buildCardLayer(W, H, totalW, totalH){
+    const layer = (typeof OffscreenCanvas === 'function')
+      ? new OffscreenCanvas(W, H)
+      : Object.assign(document.createElement('canvas'), { width: W, height: H });
+    const lctx = layer.getContext('2d');
+    lctx.fillStyle = 'rgba(47,62,70,0.03)';
+    lctx.fillRect(0, 0, W, H);
+    lctx.globalAlpha = 0.65;
+    for (const b of measureCards()) {
+      const x = (b.x / totalW) * W;
+      const y = (b.y / totalH) * H;
+      const w = Math.max(1, (b.w / totalW) * W);
+      const h = Math.max(1, (b.h / totalH) * H);
+      lctx.fillStyle = b.color;
+      lctx.fillRect(x, y, w, h);
+    }
+    return { image: layer, W, H, totalW, totalH };
+  }
+  function draw(){
+    frameRequested = false;
+    if (!needsRedraw) return;
+    needsRedraw = false;
+    layoutCanvas();
+    const dpr = window.devicePixelRatio || 1;
+    const W = canvas.width;
+    const H = canvas.height;
+    ctx.clearRect(0, 0, W, H);
+    const totalW = Math.max(1, scroller.scrollWidth);
+    const totalH = Math.max(1, timeline.scrollHeight);
+    const timelineTop = getTimelineTop();
+    if (!cardLayer || cardLayer.W !== W || cardLayer.H !== H
+        || cardLayer.totalW !== totalW || cardLayer.totalH !== totalH) {
+      cardLayer = buildCardLayer(W, H, totalW, totalH);
+    }
+    ctx.drawImage(cardLayer.image, 0, 0);
+    const viewX = (scroller.scrollLeft / totalW) * W;
+    const viewW = (scroller.clientWidth / totalW) * W;
+    const pageTopInTimeline = (window.scrollY - timelineTop);
+    const viewY = (pageTopInTimeline / totalH) * H;
+    const viewH = (window.innerHeight / totalH) * H;
+    const vx = clamp(viewX, 0, W);
+    const vy = clamp(viewY, 0, H);
+    const vw = clamp(viewW, 2, W);
+    const vh = clamp(viewH, 2, H);
+    ctx.strokeStyle = '#2f3e46';
+    ctx.lineWidth = Math.max(1, 2 * dpr);
+    ctx.strokeRect(vx, vy, vw, vh);
+    ctx.fillStyle = 'rgba(47,62,70,0.10)';
+    ctx.fillRect(vx, vy, vw, vh);
+  }
+  function requestRedraw(remeasure){
+    if (remeasure) cardLayer = null;
+    needsRedraw = true;
+    // Scroll events can fire several times per frame; keep one frame callback pending.
+    if (frameRequested) return;
+    frameRequested = true;
+    window.requestAnimationFrame(draw);
+  }
+  function goToCanvasPoint(clientX, clientY){
+    const rect = canvas.getBoundingClientRect();
+    const x = clamp(clientX - rect.left, 0, rect.width);
+    const y = clamp(clientY - rect.top, 0, rect.height);
+    const totalW = Math.max(1, scroller.scrollWidth);
+    const totalH = Math.max(1, timeline.scrollHeight);
+    const timelineTop = getTimelineTop();
+    const targetX = (x / rect.width) * totalW - scroller.clientWidth / 2;
+    scroller.scrollLeft = clamp(targetX, 0, totalW - scroller.clientWidth);
+    const targetYAbs = timelineTop + (y / rect.height) * totalH - window.innerHeight / 2;
+    const maxScrollY = document.documentElement.scrollHeight - window.innerHeight;
+    window.scrollTo({ top: clamp(targetYAbs, 0, maxScrollY), behavior: 'auto' });
+    requestRedraw();
+  }
+  scroller.addEventListener('scroll', () => requestRedraw(), { passive: true });
+  window.addEventListener('scroll', () => requestRedraw(), { passive: true });
+  window.addEventListener('resize', () => { updateBodyOverflowCues(); requestRedraw(true); });
+  canvas.addEventListener('mousedown', (e) => { dragging = true; goToCanvasPoint(e.clientX, e.clientY); });
+  window.addEventListener('mousemove', (e) => { if (!dragging) return; goToCanvasPoint(e.clientX, e.clientY); });
+  window.addEventListener('mouseup', () => { dragging = false; });
+  canvas.addEventListener('touchstart', (e) => {
+    dragging = true;
+    const t = e.touches[0];
+    goToCanvasPoint(t.clientX, t.clientY);
+    e.preventDefault();
+  }, { passive: false });
+  window.addEventListener('touchmove', (e) => {
+    if (!dragging) return;
+    const t = e.touches[0];
+    goToCanvasPoint(t.clientX, t.clientY);
+    e.preventDefault();
+  }, { passive: false });
+  window.addEventListener('touchend', () => { dragging = false; });
+  window.setTimeout(() => { updateBodyOverflowCues(); requestRedraw(true); }, 50);
+})();"""
+
+_HEAD_HTML = "\n".join(
+    [
+        "<!DOCTYPE html>",
+        "<html lang='nl'>",
+        "<head>",
+        "<meta charset='utf-8' />",
+        "<title>Timeline</title>",
+        "<style>",
+        _CSS_BLOCK,
+        "</style>",
+        "</head>",
+    ]
+)
+
+_LEGEND_HTML = """\
+<body>
+<div class='legend'>
+  <div class='legend-item'><span class='legend-box'></span> Zeker</div>
+  <div class='legend-item'><span class='legend-box uncertain'></span> Onzeker</div>
+  <div class='legend-item'><span class='legend-box unverified'></span> Ongeverifieerd</div>
+</div>
+<div id='minimap'>
+  <div id='minimap-title'>Overview</div>
+  <canvas id='minimap-canvas'></canvas>
+</div>
+<div class='timeline-scroller'>
+  <div class='timeline'>"""
+
+# Script plus the closing tags of .timeline, .timeline-scroller and the document.
+_TAIL_HTML = "\n".join(
+    ["<script>", _JS_BLOCK, "</script>", "</div>", "</div>", "</body>", "</html>"]
+)
+
+# Positional fields: class, x, width, date, time, has-more, short text, full text, sources.
+_CARD_TEMPLATE = (
+    "<div class='{0}' data-event='1' style='left: {1}px; width: {2}px;'>"
+    "<div class='card-header'>{3} &middot; {4}</div>"
+    "<div class='card-body{5}' data-short-text='{6}' data-full-text='{7}'>{6}</div>"
+    "{8}"
+    "<div class='tooltip'>{7}</div>"
+    "</div>"
 )
 
+# Card class attribute for each (is_range, certain, verified) combination.
+_CARD_CLASSES = {
+    (is_range_, certain, verified): "card"
+    + (" range" if is_range_ else "")
+    + ("" if certain else " uncertain")
+    + ("" if verified else " unverified")
+    for is_range_ in (False, True)
+    for certain in (False, True)
+    for verified in (False, True)
+}
+
+_event_id = attrgetter("event_id")
+_start_dt = attrgetter("start_dt")
+_card_fields = attrgetter("description", "date_label", "time_label", "certain", "verified", "sources")
+
+
 # -------------------------
 # Main
 # -------------------------
-def generate_horizontal_timeline(excel_path: str | Path, output_path: str | Path) -> None:
-    events = read_events_from_excel(excel_path)
-    entity_events = group_events_by_entity(events)
+def _assign_lanes(starts: list[int], ends: list[int]) -> list[int]:
+    # Interval partitioning over cards sorted by start: overlap in time decides
+    # vertical stacking. `active` holds (end, lane) for lanes whose last card
+    # overlaps the sweep position; `free` holds lanes that have ended. Taking the
+    # lowest free lane is the same first-fit choice as scanning every lane, at
+    # O(log L) per card. Works on plain int times only, independent of TimelineEvent.
+    push, pop = heapq.heappush, heapq.heappop
+    active: list[tuple[int, int]] = []
+    free: list[int] = []
+    lanes: list[int] = []
+    n_lanes = 0
+    for start, end in zip(starts, ends):
+        while active and active[0][0] < start:
+            push(free, pop(active)[1])
+        if free:
+            lane = pop(free)
+        else:
+            lane = n_lanes
+            n_lanes += 1
+        lanes.append(lane)
+        push(active, (end, lane))
+    return lanes
+
+
+def _compute_layout(
+    events: list[TimelineEvent],
+) -> tuple[dict[str, list[list[dict]]], int, dict[str, str]]:
+    # Group once from a single global sort: each entity's list is then already in
+    # sorted_events() order. Entities keep first-seen order, including those whose
+    # events all lack a start time (they still get an empty row).
+    entity_events: dict[str, list[TimelineEvent]] = {
+        entity: [] for e in events for entity in e.entities
+    }
+    for e in sorted_events(events):
+        if e.start_dt is None:
+            break  # unknown starts sort last
+        for entity in e.entities:
+            entity_events[entity].append(e)
     # 2) Build GLOBAL packed x-axis over all entities (slot-based, not linear time)
     gap = 24
 
-    timed_events = [e for e in events if e.start_dt is not None]
-    timed_events.sort(key=lambda e: (e.start_dt, e.end_dt is None, e.event_id))
+    # Order by (start_dt, end_dt is None, event_id) using stable passes with C-level
+    # keys: id order first, then open-ended events after the others, then by start.
+    by_id = sorted((e for e in events if e.start_dt is not None), key=_event_id)
+    timed_events = [e for e in by_id if e.end_dt is not None]
+    timed_events.extend(e for e in by_id if e.end_dt is None)
+    timed_events.sort(key=_start_dt)
 
     if not timed_events:
         raise ValueError("No events with a valid start time were found.")
 
-    # Assign slots globally
-    slot_of: dict[int, int] = {}
-    event_at_slot: list[TimelineEvent] = []
-    for s, e in enumerate(timed_events):
-        slot_of[e.event_id] = s
-        event_at_slot.append(e)
+    # Assign slots globally: slot i holds the i-th event in start order
+    event_at_slot: list[TimelineEvent] = timed_events
+
+    # One pass over the slots collects everything the array math below needs:
+    # card text lengths (of f"{date_label} {time_label} {description}", without
+    # building it), start times, and the slot and end time of each range event.
+    n_slots = len(event_at_slot)
+    text_lengths = np.empty(n_slots, dtype=np.int64)
+    slot_starts: list[datetime] = []
+    range_slots: list[int] = []
+    range_ends: list[datetime] = []
+    for i, e in enumerate(event_at_slot):
+        text_lengths[i] = len(e.date_label) + len(e.time_label) + len(e.description) + 2
+        slot_starts.append(e.start_dt)
+        if is_range(e):
+            range_slots.append(i)
+            range_ends.append(e.end_dt)
 
     # Slot widths (initial), based on card text
-    slot_width: list[int] = []
-    for e in event_at_slot:
-        txt = f"{e.date_label} {e.time_label} {e.description}"
-        slot_width.append(estimate_card_width(txt, is_range(e)))
-
-    # Compute packed x start for each slot
-    x_start: list[int] = [0] * len(event_at_slot)
-    x = 0
-    for i in range(len(event_at_slot)):
-        x_start[i] = x
-        x += slot_width[i] + gap
-
-    # For each range event, find the furthest slot whose event starts within the range
-    range_max_slot: dict[int, int] = {}
-    for r in (e for e in event_at_slot if is_range(e)):
-        r_slot = slot_of[r.event_id]
-        max_slot = r_slot
-        # Events are globally ordered by start_dt; we can scan and check containment
-        for e in event_at_slot:
-            if e.start_dt is None:
-                continue
-            if r.start_dt <= e.start_dt <= r.end_dt:  # type: ignore[operator]
-                max_slot = max(max_slot, slot_of[e.event_id])
-        range_max_slot[r.event_id] = max_slot
+    widths = estimate_card_widths(text_lengths)
+
+    # Packed x start for each slot: an exclusive prefix sum over width + gap.
+    x_start = np.zeros_like(widths)
+    np.cumsum(widths[:-1] + gap, out=x_start[1:])
+
+    # For each range event, find the furthest slot whose event starts within the range.
+    # Slots are ordered by start_dt, so that is the last slot starting at or before
+    # the range end: one searchsorted over the range events only.
+    # Times are compared as int64 microseconds from here on (datetimes carry µs precision).
+    range_idx = np.array(range_slots, dtype=np.intp)
+    start_us = np.array(slot_starts, dtype="datetime64[us]").view(np.int64)
+    end_us = start_us.copy()
+    end_us[range_idx] = np.array(range_ends, dtype="datetime64[us]").view(np.int64)
+    last_slot = np.maximum(
+        np.searchsorted(start_us, end_us[range_idx], side="right") - 1, range_idx
+    )
 
     # Final per-event x and width (range widths expanded to cover contained events)
-    event_x: dict[int, int] = {}
-    event_w: dict[int, int] = {}
-
-    for e in event_at_slot:
-        s = slot_of[e.event_id]
-        event_x[e.event_id] = x_start[s]
-
-        w = slot_width[s]
-        if is_range(e):
-            last_slot = range_max_slot[e.event_id]
-            right_edge = x_start[last_slot] + slot_width[last_slot]
-            w = max(w, right_edge - x_start[s])
-        event_w[e.event_id] = w
+    card_w = widths.copy()
+    card_w[range_idx] = np.maximum(
+        widths[range_idx], x_start[last_slot] + widths[last_slot] - x_start[range_idx]
+    )
+    range_mask = np.zeros(n_slots, dtype=bool)
+    range_mask[range_idx] = True
+    # Everything the per-entity sweep needs, looked up once per event:
+    # (x, width, is_range, start_us, end_us).
+    placement: dict[int, tuple[int, int, bool, int, int]] = {
+        e.event_id: fields
+        for e, fields in zip(
+            event_at_slot,
+            zip(x_start.tolist(), card_w.tolist(), range_mask.tolist(), start_us.tolist(), end_us.tolist()),
+        )
+    }
 
     # Timeline max width for container sizing
-    max_width = (x_start[-1] + slot_width[-1]) if event_at_slot else 0
+    max_width = int(x_start[-1] + widths[-1])
 
     # 3) Build per-entity layout (vertical stacking per entity only)
     layout: dict[str, list[list[dict]]] = {}
 
     for entity, entity_list in entity_events.items():
-        subrows: list[list[dict]] = []
-
-        for event in sorted_events(entity_list):
-            if event.start_dt is None:
-                # If you want to include "unknown time" events, you could handle them separately.
-                continue
-
-            is_range_event = is_range(event)
-            card_text = f"{event.date_label} {event.time_label} {event.description}"
-            width = event_w.get(event.event_id, estimate_card_width(card_text, is_range_event))
-            x = event_x.get(event.event_id, 0)
-
-            placed = False
-            for subrow in subrows:
-                last = subrow[-1] if subrow else None
-                # overlap check in time to decide vertical stacking inside this entity
-                if last and event.start_dt and last["event"].start_dt:
-                    last_start = last["event"].start_dt
-                    last_end = last["end_dt"] or last_start
-                    this_start = event.start_dt
-                    this_end = event.end_dt or event.start_dt
-
-                    if overlaps(this_start, this_end, last_start, last_end):
-                        continue
-
-                subrow.append(
-                    {
-                        "event": event,
-                        "x": x,
-                        "width": width,
-                        "is_range": is_range_event,
-                        "end_dt": event.end_dt or event.start_dt,
-                    }
-                )
-                placed = True
-                break
-
-            if not placed:
-                subrows.append(
-                    [
-                        {
-                            "event": event,
-                            "x": x,
-                            "width": width,
-                            "is_range": is_range_event,
-                            "end_dt": event.end_dt or event.start_dt,
-                        }
-                    ]
-                )
-
-        # Keep cards in each subrow ordered by x for nicer rendering
-        for subrow in subrows:
-            subrow.sort(key=lambda item: item["x"])
+        # "Unknown time" events were left out when grouping; they could be handled separately.
+        # Every timed event got a slot above.
+        places = [placement[event.event_id] for event in entity_list]
+        lanes = _assign_lanes([place[3] for place in places], [place[4] for place in places])
+
+        subrows: list[list[dict]] = [[] for _ in range(max(lanes, default=-1) + 1)]
+        for event, (x, width, is_range_event, _, _), lane in zip(entity_list, places, lanes):
+            # Cards enter a lane in start order, so each subrow is already ordered by x.
+            subrows[lane].append(
+                {
+                    "event": event,
+                    "x": x,
+                    "width": width,
+                    "is_range": is_range_event,
+                }
+            )
 
         layout[entity] = subrows
 
     # Build deterministic, dataset-local entity colours with strong hue separation.
     all_entities = sorted(entity_events.keys(), key=lambda s: s.lower())
     entity_colors = build_entity_colors(all_entities)
-
-    # 4) Write HTML
-    html_parts = [
-        "<!DOCTYPE html>",
-        "<html lang='nl'>",
-        "<head>",
-        "<meta charset='utf-8' />",
-        "<title>Timeline</title>",
-        "<style>",
-
-        "body { font-family: 'Segoe UI', sans-serif; margin: 20px; }",
-
-        "#minimap {",
-        "  position: fixed;",
-        "  right: 18px;",
-        "  bottom: 18px;",
-        "  width: 260px;",
-        "  height: 180px;",
-        "  background: rgba(255,255,255,0.92);",
-        "  border: 2px solid #2f3e46;",
-        "  border-radius: 12px;",
-        "  box-shadow: 0 8px 24px rgba(0,0,0,0.12);",
-        "  z-index: 999;",
-        "  display: flex;",
-        "  flex-direction: column;",
-        "  overflow: hidden;",
-        "}",
-        "#minimap-title {",
-        "  font-size: 12px;",
-        "  font-weight: 600;",
-        "  padding: 6px 10px;",
-        "  border-bottom: 1px solid rgba(47,62,70,0.25);",
-        "}",
-        "#minimap-canvas {",
-        "  width: 100%;",
-        "  height: 100%;",
-        "  display: block;",
-        "  cursor: pointer;",
-        "}",
-
-
-        ":root { --label-w: 220px; --label-gap: 16px; }",
-
-        ".timeline-scroller {",
-        "  overflow-x: auto;",
-        "  overflow-y: visible;",
-        "  position: relative;",
-        "  padding-bottom: 10px;",
-        "}",
-
-        ".timeline {",
-        "  display: flex;",
-        "  flex-direction: column;",
-        "  gap: 5px;",
-        "  min-width: fit-content;",
-        "}",
-
-        ".entity {",
-        "  position: relative;",
-        "  border-left: 6px solid var(--entity-color, #2f3e46);",
-        "  padding-left: calc(var(--label-w) + var(--label-gap));",
-        "}",
-
-        ".entity-title {",
-        "  position: sticky;",
-        "  left: 0;",
-        "  z-index: 100;",
-        "  width: var(--label-w);",
-        "  margin-left: calc(-1 * (var(--label-w) + var(--label-gap)));",
-        "  font-weight: 600;",
-        "  background: white;",
-        "  padding: 4px 10px;",
-        "  border-radius: 10px;",
-        "  border: 2px solid var(--entity-color, #2f3e46);",
-        "  white-space: nowrap;",
-        "  margin-bottom: 12px;",
-        "}",
-
-        ".subrow {",
-        "  position: relative;",
-        "  height: 95px;",
-        "  margin-bottom: 2px;",
-        "}",
-
-        ".card {",
-        "  position: absolute;",
-        "  height: 90px;",
-        "  padding: 8px 10px 34px 10px;",
-        "  border: 2px solid #2f3e46;",
-        "  border-left: 8px solid var(--entity-color, #2f3e46);",
-        "  border-radius: 10px;",
-        "  background: #f9fbfb;",
-        "  box-sizing: border-box;",
-        "  overflow: hidden;",
-        "  cursor: pointer;",
-        "}",
-
-        ".card:hover {",
-        "  overflow: visible;",
-        "  z-index: 200;",
-        "}",
-
-        ".card.expanded {",
-        "  height: auto !important;",
-        "  min-height: 90px;",
-        "  padding-bottom: 10px;",
-        "  overflow: visible;",
-        "  z-index: 1500;",
-        "  box-shadow: 0 10px 26px rgba(0,0,0,0.16);",
-        "}",
-
-        ".card.expanded .card-body {",
-        "  max-height: none;",
-        "  overflow: visible;",
-        "  padding-right: 0;",
-        "}",
-
-        ".card.expanded .card-body::after {",
-        "  display: none;",
-        "}",
-
-        ".card.expanded .card-sources {",
-        "  position: static;",
-        "  margin-top: 8px;",
-        "}",
-
-        ".card-header {",
-        "  font-weight: 600;",
-        "  margin-bottom: 4px;",
-        "  font-size: 12px;",
-        "}",
-
-        ".card-body {",
-        "  line-height: 1.2;",
-        "  margin-bottom: 0;",
-        "  max-height: 42px;",
-        "  overflow: hidden;",
-        "  position: relative;",
-        "  padding-right: 34px;",
-        "}",
-
-        ".card-body.has-more::after, .card-body.truncated::after {",
-        "  content: '?';",
-        "  position: absolute;",
-        "  right: 0;",
-        "  bottom: 24px;",
-        "  width: 16px;",
-        "  text-align: right;",
-        "  font-size: 14px;",
-        "  font-weight: 700;",
-        "  color: rgba(47,62,70,0.78);",
-        "  background: linear-gradient(90deg, rgba(249,251,251,0), rgba(249,251,251,0.97) 48%);",
-        "}",
-
-        ".card-sources {",
-        "  position: absolute;",
-        "  right: 8px;",
-        "  bottom: 6px;",
-        "  display: flex;",
-        "  gap: 6px;",
-        "  align-items: center;",
-        "}",
-
-        ".source-link, .source-copy {",
-        "  width: 22px;",
-        "  height: 22px;",
-        "  border: 1px solid rgba(47,62,70,0.35);",
-        "  border-radius: 6px;",
-        "  background: #fff;",
-        "  display: inline-flex;",
-        "  align-items: center;",
-        "  justify-content: center;",
-        "  cursor: pointer;",
-        "  padding: 0;",
-        "  text-decoration: none;",
-        "}",
-
-        ".source-link:hover, .source-copy:hover {",
-        "  background: rgba(47,62,70,0.08);",
-        "}",
-
-        ".source-icon {",
-        "  width: 12px;",
-        "  height: 12px;",
-        "  position: relative;",
-        "  display: inline-block;",
-        "}",
-
-        ".source-icon-link::before {",
-        "  content: '';",
-        "  position: absolute;",
-        "  width: 8px;",
-        "  height: 8px;",
-        "  right: 1px;",
-        "  top: 1px;",
-        "  border-top: 2px solid #2f3e46;",
-        "  border-right: 2px solid #2f3e46;",
-        "}",
-
-        ".source-icon-link::after {",
-        "  content: '';",
-        "  position: absolute;",
-        "  width: 7px;",
-        "  height: 2px;",
-        "  left: 1px;",
-        "  bottom: 2px;",
-        "  background: #2f3e46;",
-        "  transform: rotate(-45deg);",
-        "  transform-origin: left center;",
-        "}",
-
-        ".source-icon-file::before {",
-        "  content: '';",
-        "  position: absolute;",
-        "  left: 1px;",
-        "  top: 1px;",
-        "  width: 8px;",
-        "  height: 10px;",
-        "  border: 2px solid #2f3e46;",
-        "  border-radius: 2px;",
-        "}",
-
-        ".source-icon-file::after {",
-        "  content: '';",
-        "  position: absolute;",
-        "  right: 1px;",
-        "  top: 2px;",
-        "  width: 4px;",
-        "  height: 4px;",
-        "  border-top: 2px solid #2f3e46;",
-        "  border-right: 2px solid #2f3e46;",
-        "}",
-
-        ".source-copy.copied {",
-        "  background: #dfeff2;",
-        "}",
-
-        ".tooltip {",
-        "  display: none;",
-        "  position: fixed;",
-        "  left: 0;",
-        "  top: 0;",
-        "  max-width: 520px;",
-        "  max-height: min(60vh, 420px);",
-        "  overflow: auto;",
-        "  padding: 10px 12px;",
-        "  border: 2px solid #2f3e46;",
-        "  border-radius: 10px;",
-        "  background: #ffffff;",
-        "  box-shadow: 0 6px 18px rgba(0,0,0,0.12);",
-        "  font-size: 13px;",
-        "  line-height: 1.3;",
-        "  pointer-events: none;",
-        "  z-index: 2000;",
-        "}",
-
-        ".legend {",
-        "  margin-bottom: 20px;",
-        "  display: flex;",
-        "  gap: 20px;",
-        "  font-size: 12px;",
-        "}",
-
-        ".legend-item {",
-        "  display: flex;",
-        "  align-items: center;",
-        "  gap: 6px;",
-        "}",
-
-        ".legend-box {",
-        "  width: 18px;",
-        "  height: 12px;",
-        "  border: 2px solid #2f3e46;",
-        "  border-radius: 4px;",
-        "}",
-
-        ".legend-box.uncertain {",
-        "  border-style: dashed;",
-        "}",
-
-        ".legend-box.unverified {",
-        "  border-style: dotted;",
-        "  border-color: #9aa0a6;",
-        "  background: #f2f3f5;",
-        "}",
-
-        "</style>",
-        "</head>",
+    return layout, max_width, entity_colors
 
 
+def _iter_html_lines(
+    layout: dict[str, list[list[dict]]], max_width: int, entity_colors: dict[str, str]
+) -> Iterator[str]:
+    # 4) Emit HTML line by line so callers can join or stream it
+    esc = escape_html
+    trunc = truncate
+    sources_html = render_sources_html
+    # Many events cite the same list of sources; render each distinct list once.
+    sources_cache: dict[tuple[str, ...], str] = {}
+    card_format = _CARD_TEMPLATE.format
+    card_classes = _CARD_CLASSES
 
+    yield _HEAD_HTML
+    yield _LEGEND_HTML
 
-        "<body>",
-
-        "<div class='legend'>",
-        "  <div class='legend-item'><span class='legend-box'></span> Zeker</div>",
-        "  <div class='legend-item'><span class='legend-box uncertain'></span> Onzeker</div>",
-        "  <div class='legend-item'><span class='legend-box unverified'></span> Ongeverifieerd</div>",
-        "</div>",
-
-        "<div id='minimap'>",
-        "  <div id='minimap-title'>Overview</div>",
-        "  <canvas id='minimap-canvas'></canvas>",
-        "</div>",
-
-
-        "<div class='timeline-scroller'>",
-        "  <div class='timeline'>",
-    ]
-
-
+    entity_width = max_width + 40
     for entity, subrows in layout.items():
-        color = entity_colors[entity]
-        html_parts.append(
-            f"<div class='entity' style='width: {max_width + 40}px; --entity-color: {color};'>"
+        yield (
+            f"<div class='entity' style='width: {entity_width}px; "
+            f"--entity-color: {entity_colors[entity]};'>"
         )
-        html_parts.append(f"<div class='entity-title'>{entity}</div>")
+        yield f"<div class='entity-title'>{entity}</div>"
         for subrow in subrows:
-            html_parts.append("<div class='subrow'>")
+            # Each subrow is emitted as one joined block rather than line by line.
+            lines = ["<div class='subrow'>"]
+            append = lines.append
             for card in subrow:
-                event = card["event"]
-                classes = ["card"]
-                if card["is_range"]:
-                    classes.append("range")
-                if not event.certain:
-                    classes.append("uncertain")
-                if not event.verified:
-                    classes.append("unverified")
-
-                desc_full = html.escape(event.description)
-                desc_full_attr = html.escape(event.description, quote=True)
-                short_plain = truncate(event.description, 120)
-                desc_short = html.escape(short_plain)
-                desc_short_attr = html.escape(short_plain, quote=True)
-                has_more = event.description != short_plain
-                sources_html = render_sources_html(event.sources)
-
-                html_parts.append(
-                    (
-                        f"<div class='{ ' '.join(classes) }' "
-                        f"data-event='1' "
-                        f"style='left: {card['x']}px; width: {card['width']}px;'>"
-                        f"<div class='card-header'>{event.date_label} &middot; {event.time_label}</div>"
-                        f"<div class='card-body{' has-more' if has_more else ''}' "
-                        f"data-short-text='{desc_short_attr}' data-full-text='{desc_full_attr}'>{desc_short}</div>"
-                        f"{sources_html}"
-                        f"<div class='tooltip'>{desc_full}</div>"
-                        "</div>"
+                description, date_label, time_label, certain, verified, sources = _card_fields(
+                    card["event"]
+                )
+                # escape_html also escapes quotes, so text and attribute forms are equal.
+                desc_full = esc(description)
+                short_plain = trunc(description, 120)
+                truncated = short_plain != description
+                source_key = tuple(sources)
+                sources_markup = sources_cache.get(source_key)
+                if sources_markup is None:
+                    sources_markup = sources_cache[source_key] = sources_html(sources)
+
+                append(
+                    card_format(
+                        card_classes[card["is_range"], certain, verified],
+                        card["x"],
+                        card["width"],
+                        date_label,
+                        time_label,
+                        " has-more" if truncated else "",
+                        esc(short_plain) if truncated else desc_full,
+                        desc_full,
+                        sources_markup,
                     )
                 )
-            html_parts.append("</div>")
-        html_parts.append("</div>")
-    html_parts.extend([
-                "<script>",
-                "(function(){",
-                "  document.addEventListener('click', async (e) => {",
-                "    const btn = e.target.closest('.source-copy[data-copy-source]');",
-                "    if (!btn) return;",
-                "    const value = btn.getAttribute('data-copy-source') || '';",
-                "    try {",
-                "      await navigator.clipboard.writeText(value);",
-                "      btn.classList.add('copied');",
-                "      window.setTimeout(() => btn.classList.remove('copied'), 500);",
-                "    } catch (_) {}",
-                "  });",
-                "  function updateBodyOverflowCues(){",
-                "    const bodies = document.querySelectorAll('.card-body');",
-                "    for (const body of bodies) {",
-                "      const clipped = (body.scrollHeight - body.clientHeight) > 1;",
-                "      body.classList.toggle('truncated', clipped);",
-                "    }",
-                "  }",
-                "  function initCardExpansion(){",
-                "    const cards = document.querySelectorAll('.card[data-event=\"1\"]');",
-                "    let activeCard = null;",
-                "    function setBodyText(card, useFull){",
-                "      const body = card.querySelector('.card-body');",
-                "      if (!body) return;",
-                "      body.textContent = useFull ? (body.dataset.fullText || body.textContent || '') : (body.dataset.shortText || body.textContent || '');",
-                "    }",
-                "    function collapseActive(){",
-                "      if (!activeCard) return;",
-                "      setBodyText(activeCard, false);",
-                "      activeCard.classList.remove('expanded');",
-                "      activeCard = null;",
-                "      updateBodyOverflowCues();",
-                "      requestRedraw();",
-                "    }",
-                "    for (const card of cards) {",
-                "      card.addEventListener('click', (e) => {",
-                "        if (e.target.closest('.source-link, .source-copy')) return;",
-                "        e.stopPropagation();",
-                "        if (activeCard === card) { collapseActive(); return; }",
-                "        collapseActive();",
-                "        setBodyText(card, true);",
-                "        card.classList.add('expanded');",
-                "        activeCard = card;",
-                "        updateBodyOverflowCues();",
-                "        requestRedraw();",
-                "      });",
-                "    }",
-                "    document.addEventListener('click', (e) => {",
-                "      if (!activeCard) return;",
-                "      if (e.target.closest('.card[data-event=\"1\"]')) return;",
-                "      collapseActive();",
-                "    });",
-                "  }",
-                "  const scroller = document.querySelector('.timeline-scroller');",
-                "  const timeline = document.querySelector('.timeline');",
-                "  const canvas = document.getElementById('minimap-canvas');",
-                "  const box = document.getElementById('minimap');",
-                "  if (!scroller || !timeline || !canvas || !box) return;",
-                "  initCardExpansion();",
-                "  const ctx = canvas.getContext('2d');",
-                "  let dragging = false;",
-                "  let needsRedraw = true;",
-                "  function clamp(v, lo, hi) { return Math.max(lo, Math.min(hi, v)); }",
-                "  function layoutCanvas(){",
-                "    const dpr = window.devicePixelRatio || 1;",
-                "    const rect = canvas.getBoundingClientRect();",
-                "    const w = Math.max(1, Math.floor(rect.width * dpr));",
-                "    const h = Math.max(1, Math.floor(rect.height * dpr));",
-                "    if (canvas.width !== w || canvas.height !== h) {",
-                "      canvas.width = w; canvas.height = h;",
-                "      needsRedraw = true;",
-                "    }",
-                "  }",
-                "  function getTimelineTop(){",
-                "    const r = timeline.getBoundingClientRect();",
-                "    return r.top + window.scrollY;",
-                "  }",
-                "  function draw(){",
-                "    if (!needsRedraw) return;",
-                "    needsRedraw = false;",
-                "    layoutCanvas();",
-                "    const dpr = window.devicePixelRatio || 1;",
-                "    const W = canvas.width;",
-                "    const H = canvas.height;",
-                "    ctx.clearRect(0, 0, W, H);",
-                "    const totalW = Math.max(1, scroller.scrollWidth);",
-                "    const totalH = Math.max(1, timeline.scrollHeight);",
-                "    const scrollerRect = scroller.getBoundingClientRect();",
-                "    const timelineTop = getTimelineTop();",
-                "    ctx.fillStyle = 'rgba(47,62,70,0.03)';",
-                "    ctx.fillRect(0, 0, W, H);",
-                "    const cards = timeline.querySelectorAll('.card[data-event=\"1\"]');",
-                "    for (const card of cards) {",
-                "      const r = card.getBoundingClientRect();",
-                "      const xContent = (r.left - scrollerRect.left) + scroller.scrollLeft;",
-                "      const yContent = (r.top + window.scrollY) - timelineTop;",
-                "      const wContent = r.width;",
-                "      const hContent = r.height;",
-                "      const x = (xContent / totalW) * W;",
-                "      const y = (yContent / totalH) * H;",
-                "      const w = Math.max(1, (wContent / totalW) * W);",
-                "      const h = Math.max(1, (hContent / totalH) * H);",
-                "      const color = getComputedStyle(card).getPropertyValue('--entity-color').trim() || '#2f3e46';",
-                "      ctx.fillStyle = color;",
-                "      ctx.globalAlpha = 0.65;",
-                "      ctx.fillRect(x, y, w, h);",
-                "    }",
-                "    ctx.globalAlpha = 1.0;",
-                "    const viewX = (scroller.scrollLeft / totalW) * W;",
-                "    const viewW = (scroller.clientWidth / totalW) * W;",
-                "    const pageTopInTimeline = (window.scrollY - timelineTop);",
-                "    const viewY = (pageTopInTimeline / totalH) * H;",
-                "    const viewH = (window.innerHeight / totalH) * H;",
-                "    const vx = clamp(viewX, 0, W);",
-                "    const vy = clamp(viewY, 0, H);",
-                "    const vw = clamp(viewW, 2, W);",
-                "    const vh = clamp(viewH, 2, H);",
-                "    ctx.strokeStyle = '#2f3e46';",
-                "    ctx.lineWidth = Math.max(1, 2 * dpr);",
-                "    ctx.strokeRect(vx, vy, vw, vh);",
-                "    ctx.fillStyle = 'rgba(47,62,70,0.10)';",
-                "    ctx.fillRect(vx, vy, vw, vh);",
-                "  }",
-                "  function requestRedraw(){",
-                "    needsRedraw = true;",
-                "    window.requestAnimationFrame(draw);",
-                "  }",
-                "  function goToCanvasPoint(clientX, clientY){",
-                "    const rect = canvas.getBoundingClientRect();",
-                "    const x = clamp(clientX - rect.left, 0, rect.width);",
-                "    const y = clamp(clientY - rect.top, 0, rect.height);",
-                "    const totalW = Math.max(1, scroller.scrollWidth);",
-                "    const totalH = Math.max(1, timeline.scrollHeight);",
-                "    const timelineTop = getTimelineTop();",
-                "    const targetX = (x / rect.width) * totalW - scroller.clientWidth / 2;",
-                "    scroller.scrollLeft = clamp(targetX, 0, totalW - scroller.clientWidth);",
-                "    const targetYAbs = timelineTop + (y / rect.height) * totalH - window.innerHeight / 2;",
-                "    const maxScrollY = document.documentElement.scrollHeight - window.innerHeight;",
-                "    window.scrollTo({ top: clamp(targetYAbs, 0, maxScrollY), behavior: 'auto' });",
-                "    requestRedraw();",
-                "  }",
-                "  scroller.addEventListener('scroll', requestRedraw, { passive: true });",
-                "  window.addEventListener('scroll', requestRedraw, { passive: true });",
-                "  window.addEventListener('resize', () => { updateBodyOverflowCues(); requestRedraw(); });",
-                "  canvas.addEventListener('mousedown', (e) => { dragging = true; goToCanvasPoint(e.clientX, e.clientY); });",
-                "  window.addEventListener('mousemove', (e) => { if (!dragging) return; goToCanvasPoint(e.clientX, e.clientY); });",
-                "  window.addEventListener('mouseup', () => { dragging = false; });",
-                "  canvas.addEventListener('touchstart', (e) => {",
-                "    dragging = true;",
-                "    const t = e.touches[0];",
-                "    goToCanvasPoint(t.clientX, t.clientY);",
-                "    e.preventDefault();",
-                "  }, { passive: false });",
-                "  window.addEventListener('touchmove', (e) => {",
-                "    if (!dragging) return;",
-                "    const t = e.touches[0];",
-                "    goToCanvasPoint(t.clientX, t.clientY);",
-                "    e.preventDefault();",
-                "  }, { passive: false });",
-                "  window.addEventListener('touchend', () => { dragging = false; });",
-                "  window.setTimeout(() => { updateBodyOverflowCues(); requestRedraw(); }, 50);",
-                "})();",
-                "</script>",
-            ])
-
-    html_parts.extend(["</div>", "</div>", "</body>", "</html>"])
+            append("</div>")
+            yield "\n".join(lines)
+        yield "</div>"
+    yield _TAIL_HTML
+
+
+def build_horizontal_html(events: list[TimelineEvent]) -> str:
+    return "\n".join(_iter_html_lines(*_compute_layout(events)))
+
+
+def generate_horizontal_timeline(
+    excel_path: str | Path,
+    output_path: str | Path,
+    events: list[TimelineEvent] | None = None,
+) -> None:
+    if events is None:
+        events = read_events_from_excel(excel_path)
+    # Lay out first so invalid input fails before the output file is opened.
+    layout = _compute_layout(events)
 
     output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(html_parts), encoding="utf-8")
+    write_html_lines(output_path, _iter_html_lines(*layout))
     print(f"Timeline saved to {output_path.resolve()}")
 
 
@@ -16,23 +16,24 @@ output_path = Path("timeline_combined2.html")
 
 
 #%%
+_GENERATORS = {
+    "horizontal": generate_horizontal_timeline,
+    "vertical": generate_vertical_timeline,
+    "combined": generate_combined_timeline,
+}
+
+
 def generate_timeline(mode: str, excel_path: Path, output_path: Path) -> None:
-    selected = mode.strip().lower()
-    if selected == "horizontal":
-        generate_horizontal_timeline(excel_path, output_path)
-        return
-    if selected == "vertical":
-        generate_vertical_timeline(excel_path, output_path)
-        return
-    if selected == "combined":
-        generate_combined_timeline(excel_path, output_path)
-        return
-    raise ValueError("mode must be one of: horizontal, vertical, combined")
+    generator = _GENERATORS.get(mode.strip().lower())
+    if generator is None:
+        raise ValueError("mode must be one of: horizontal, vertical, combined")
+    generator(excel_path, output_path)
 
 
 #%%
 # Run cell
-generate_timeline(mode, excel_path, output_path)
+if __name__ == "__main__":
+    generate_timeline(mode, excel_path, output_path)
 
 
 # %%
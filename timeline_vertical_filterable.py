@@ -3,60 +3,997 @@ from __future__ import annotations
 
 from pathlib import Path
 import json
-import pandas as pd
+from typing import Iterator
+
+import numpy as np
 from timeline_core import (
+    TimelineEvent,
     build_entity_colors,
     is_range,
     is_web_link,
     normalize_href,
     read_events_from_excel,
+    write_html_lines,
+)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    def _dumps(obj: object) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+else:
+    _dumps = json.JSONEncoder(
+        ensure_ascii=False, check_circular=False, separators=(",", ":")
+    ).encode
+
+# Static page chrome, built once at import time.
+_CSS_BLOCK = """\
+  :root {
+    --bg: #ffffff;
+    --ink: #2f3e46;
+    --muted: rgba(47,62,70,0.55);
+    --panel: rgba(47,62,70,0.04);
+    --card: #f9fbfb;
+    --range: #eef6f7;
+    --sidebar-w: 320px;
+    --wrap-col-w: 240px;
+    --wrap-area: 0px; /* JS sets this to (#cols * colwidth + gaps) */
+    --gap-x: 20px;
+    --row-h: 98px;
+    --range-min-h: 132px;
+    --row-gap: 12px;
+    --indent: 16px;
+    --max-subcols: 4;
+    --subcol-w: 340px;
+  }
+  body { font-family: 'Segoe UI', sans-serif; margin: 0; color: var(--ink); background: var(--bg); }
+  .app { display: grid; grid-template-columns: var(--sidebar-w) 1fr; min-height: 100vh; }
+
+  /* Sidebar */
+  .sidebar { position: sticky; top: 0; align-self: start; height: 100vh; overflow: auto;
+    border-right: 2px solid rgba(47,62,70,0.12); background: #fff; }
+  .sidebar-inner { padding: 16px 14px 18px; }
+  .title { font-size: 16px; font-weight: 700; margin: 0 0 10px; }
+  .sub { font-size: 12px; color: var(--muted); margin: 0 0 14px; line-height: 1.35; }
+  .controls { display: flex; gap: 8px; margin-bottom: 12px; }
+  .btn { border: 2px solid rgba(47,62,70,0.18); background: #fff; color: var(--ink);
+    padding: 6px 10px; border-radius: 10px; cursor: pointer; font-weight: 600; font-size: 12px; }
+  .btn:hover { background: rgba(47,62,70,0.04); }
+  .entity-list { display: flex; flex-direction: column; gap: 6px; }
+  .entity-item { display: flex; align-items: center; gap: 10px; padding: 6px 8px; border-radius: 10px; }
+  .entity-item:hover { background: rgba(47,62,70,0.04); }
+  .swatch { width: 14px; height: 14px; border-radius: 5px; border: 2px solid rgba(47,62,70,0.25); }
+  .entity-name { font-size: 13px; font-weight: 600; overflow-wrap: anywhere; }
+  .count { margin-left: auto; font-size: 12px; color: var(--muted); }
+
+  /* Main */
+  .main { padding: 18px 18px 60px; }
+  .legend-top { display: flex; gap: 18px; align-items: center; margin-bottom: 14px; }
+  .chip { display: inline-flex; align-items: center; gap: 8px; font-size: 12px; }
+  .chip-box { width: 18px; height: 12px; border: 2px solid var(--ink); border-radius: 4px; background: #fff; }
+  .chip-box.uncertain { border-style: dashed; }
+  .chip-box.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }
+  .viewport { position: relative; }
+  .timeline { position: relative; min-height: 400px; }
+
+  /* Range wrapper cards */
+  .range-wrap { position: absolute; left: 0; width: var(--wrap-col-w);
+    border: 2px solid var(--ink); border-left-width: 10px; border-radius: 18px;
+    background: var(--range); box-sizing: border-box; padding: 10px 12px; overflow: hidden;
+    display: flex; flex-direction: column; gap: 6px; cursor: pointer; }
+  .range-wrap.uncertain { border-style: dashed; }
+  .range-wrap.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }
+  /* Normal cards (and also range header inside wrapper) */
+  .card { position: absolute; border: 2px solid var(--ink); border-left-width: 10px; border-radius: 18px;
+    background: var(--card); box-sizing: border-box; padding: 10px 12px; overflow: hidden; }
+  .card.uncertain { border-style: dashed; }
+  .card.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }
+  .card:hover, .range-wrap:hover { overflow: visible; z-index: 500; }
+  .sources { display: flex; gap: 6px; margin-top: 6px; }
+  .source-link, .source-copy {
+    width: 22px; height: 22px; border: 1px solid rgba(47,62,70,0.35); border-radius: 6px;
+    background: #fff; display: inline-flex; align-items: center; justify-content: center;
+    cursor: pointer; padding: 0; text-decoration: none;
+  }
+  .source-link:hover, .source-copy:hover { background: rgba(47,62,70,0.08); }
+  .source-copy.copied { background: #dfeff2; }
+  .source-icon { width: 12px; height: 12px; position: relative; display: inline-block; }
+  .source-icon-link::before {
+    content: ''; position: absolute; width: 8px; height: 8px; right: 1px; top: 1px;
+    border-top: 2px solid #2f3e46; border-right: 2px solid #2f3e46;
+  }
+  .source-icon-link::after {
+    content: ''; position: absolute; width: 7px; height: 2px; left: 1px; bottom: 2px;
+    background: #2f3e46; transform: rotate(-45deg); transform-origin: left center;
+  }
+  .source-icon-file::before {
+    content: ''; position: absolute; left: 1px; top: 1px; width: 8px; height: 10px;
+    border: 2px solid #2f3e46; border-radius: 2px;
+  }
+  .source-icon-file::after {
+    content: ''; position: absolute; right: 1px; top: 2px; width: 4px; height: 4px;
+    border-top: 2px solid #2f3e46; border-right: 2px solid #2f3e46;
+  }
+
+  /* Stacked (same-time) card */
+  .stack-card {
+    position: absolute;
+    border: 2px solid var(--ink);
+    border-left-width: 10px;
+    border-left-color: #000;
+    border-radius: 18px;
+    background: var(--card);
+    box-sizing: border-box;
+    padding: 10px 12px;
+    overflow: visible;
+  }
+  .stack-card:hover { overflow: visible; z-index: 500; }
+
+  .stack-hdr {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 10px;
+    align-items: baseline;
+    margin-bottom: 8px;
+  }
+
+  .stack-items { display: flex; flex-direction: column; gap: 10px; }
+  .single-card {
+    position: absolute;
+    border: 2px solid var(--ink);
+    border-left-width: 10px;
+    border-radius: 18px;
+    background: var(--card);
+    box-sizing: border-box;
+    padding: 10px 12px;
+    overflow: hidden;
+    cursor: pointer;
+  }
+  .single-card.uncertain { border-style: dashed; }
+  .single-card.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }
+  .stack-item {
+    border: 2px solid var(--ink);
+    border-left-width: 10px;
+    border-radius: 16px;
+    background: #fff;
+    box-sizing: border-box;
+    padding: 8px 10px;
+    position: relative;
+    overflow: hidden;
+    height: 84px;
+    cursor: pointer;
+  }
+  .stack-item.uncertain { border-style: dashed; }
+  .stack-item.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }
+  .stack-item:hover { overflow: visible; z-index: 600; }
+
+  .stack-item .body { margin-top: 6px; max-height: 2.6em; overflow: hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical; }
+  .stack-item .sources, .single-card .sources, .range-wrap .sources { position: absolute; right: 8px; top: 8px; margin-top: 0; }
+  .hdr { display: flex; flex-wrap: wrap; gap: 10px; align-items: baseline; }
+  .ent { font-weight: 800; font-size: 13px; padding: 2px 8px; border-radius: 999px; background: rgba(255,255,255,0.7);
+    border: 2px solid rgba(47,62,70,0.15); }
+  .dt { font-weight: 800; font-size: 13px; }
+  .tm { font-weight: 700; font-size: 13px; color: rgba(47,62,70,0.85); }
+  .body { margin-top: 6px; font-size: 13px; line-height: 1.25; max-height: 4.1em; overflow: hidden; position: relative; }
+  .body.truncated::after {
+    content: '?';
+    position: absolute;
+    right: 0;
+    bottom: 0;
+    width: 16px;
+    text-align: right;
+    font-size: 14px;
+    font-weight: 700;
+    color: rgba(47,62,70,0.78);
+    background: linear-gradient(90deg, rgba(249,251,251,0), rgba(249,251,251,0.97) 48%);
+  }
+  .range-wrap .hdr { flex: 0 0 auto; }
+  .range-wrap .body { flex: 1 1 auto; min-height: 0; max-height: none; overflow: hidden; margin-top: 0; }
+  .range-wrap .sources { margin-top: auto; flex: 0 0 auto; }
+
+  .tooltip { display: none !important; position: absolute; left: 0; top: 100%; margin-top: 10px;
+    max-width: 760px; padding: 10px 12px; border: 2px solid var(--ink); border-radius: 14px;
+    background: #fff; box-shadow: 0 10px 26px rgba(0,0,0,0.12); font-size: 13px; line-height: 1.3; pointer-events: none; }
+  .card:hover .tooltip, .range-wrap:hover .tooltip { display: none !important; }
+  .stack-item:hover .tooltip { display: none !important; }
+  .range-wrap.expanded, .stack-item.expanded, .single-card.expanded { overflow: visible; z-index: 1200; box-shadow: 0 10px 26px rgba(0,0,0,0.16); }
+  .range-wrap.expanded { height: auto !important; }
+  .stack-item.expanded { height: auto; }
+  .single-card.expanded { height: auto !important; }
+  .range-wrap.expanded .body, .stack-item.expanded .body, .single-card.expanded .body { max-height: none; overflow: visible; display: block; -webkit-line-clamp: unset; }
+  .range-wrap.expanded .sources, .stack-item.expanded .sources, .single-card.expanded .sources { position: absolute; right: 8px; top: 8px; margin-top: 0; }
+  .sources { position: absolute; right: 8px; top: 8px; z-index: 20; }
+  .source-toggle {
+    width: 22px; height: 22px; border: 1px solid rgba(47,62,70,0.35); border-radius: 6px;
+    background: #fff; display: inline-flex; align-items: center; justify-content: center;
+    cursor: pointer; padding: 0;
+  }
+  .source-toggle:hover { background: rgba(47,62,70,0.08); }
+  .source-icon-sources::before {
+    content: ''; position: absolute; left: 1px; top: 2px; width: 10px; height: 2px; background: #2f3e46;
+    box-shadow: 0 3px 0 #2f3e46, 0 6px 0 #2f3e46;
+  }
+  .source-popover {
+    display: none; position: absolute; right: 0; top: 28px; min-width: 280px; max-width: 520px; max-height: 260px; overflow: auto;
+    padding: 8px; border: 2px solid var(--ink); border-radius: 12px; background: #fff; box-shadow: 0 10px 26px rgba(0,0,0,0.16);
+  }
+  .sources.open .source-popover { display: block; }
+  .source-entry { display: flex; align-items: center; gap: 8px; padding: 5px 4px; }
+  .source-text { font-size: 12px; line-height: 1.25; overflow-wrap: anywhere; }
+  .source-popover .source-entry {
+    width: auto; height: auto; border: 0; border-radius: 8px; background: transparent;
+    justify-content: flex-start; padding: 6px 8px;
+  }
+  .source-popover .source-entry:hover { background: rgba(47,62,70,0.08); }
+
+  .timeline {
+    position: relative;
+    min-height: 400px;
+    /* reserve real columns: wrapper + gap + event area */
+    padding-left: 0;
+  }
+
+  /* Nice divider line */
+  .spine {
+    position: absolute;
+    left: calc(var(--wrap-area) + (var(--gap-x) / 2));
+    top: 0;
+    bottom: 0;
+    width: 2px;
+    background: rgba(47,62,70,0.10);
+  }
+  /* Small helper */
+  .empty { color: var(--muted); font-size: 13px; padding: 40px 10px; }"""
+
+_JS_BLOCK = """\
+(function(){
+  // The data stays a JSON blob: JSON.parse is faster than compiling the same
+  // data as an object literal. The element is dropped once parsed so its text
+  // is not kept alive next to the parsed objects.
+  const dataEl = document.getElementById('data');
+  const data = JSON.parse(dataEl.textContent);
+  dataEl.remove();
+  // Events arrive as parallel columns, with entities given by position in
+  // data.entities and labels and description by position in data.texts;
+  // rebuild one object per event.
+  const cols = data.events;
+  const texts = data.texts;
+  const entityNames = data.entities.map(e => e.name);
+  data.events = cols.id.map((id, i) => ({
+    id,
+    entities: cols.entities[i].map(k => entityNames[k]),
+    date_label: texts[cols.date_label[i]],
+    time_label: texts[cols.time_label[i]],
+    start_ms: cols.start_ms[i],
+    end_ms: cols.end_ms[i],
+    is_range: cols.is_range[i],
+    certain: cols.certain[i],
+    verified: cols.verified[i],
+    desc: texts[cols.desc[i]],
+    sources: cols.sources[i],
+  }));
+  // Entity colours are per dataset, not per event.
+  const colorOf = new Map(data.entities.map(e => [e.name, e.color]));
+  // Entity name -> positions of its events in data.events.
+  const eventsOf = new Map(data.entities.map((e, k) => [e.name, data.index[k]]));
+  const timelineEl = document.getElementById('timeline');
+  const listEl = document.getElementById('entity-list');
+  const btnAll = document.getElementById('btn-all');
+  const btnNone = document.getElementById('btn-none');
+
+  const cfg = {
+    rowH: cssNum('--row-h', 98),
+    rangeMinH: cssNum('--range-min-h', 132),
+    rowGap: cssNum('--row-gap', 12),
+    gapX: cssNum('--gap-x', 20),
+    wrapColW: cssNum('--wrap-col-w', 240),
+    subcolW: cssNum('--subcol-w', 340),
+    maxSubcols: Math.max(1, Math.floor(cssNum('--max-subcols', 4))),
+    indent: cssNum('--indent', 16),
+  };
+
+  function cssNum(varName, fallback){
+    const v = getComputedStyle(document.documentElement).getPropertyValue(varName).trim();
+    if (!v) return fallback;
+    const n = parseFloat(v.replace('px',''));
+    return Number.isFinite(n) ? n : fallback;
+  }
+
+  // State: all selected by default
+  const selected = new Set(data.entities.map(e => e.name));
+
+  // Counts (for sidebar display) do not depend on the selection.
+  const counts = new Map();
+  for (const ent of data.entities) counts.set(ent.name, eventsOf.get(ent.name).length);
+
+  // Sidebar UI: built once; later renders only touch the checkbox states.
+  const checkboxByName = new Map();
+  function renderSidebar(){
+    listEl.innerHTML = '';
+    for (const ent of data.entities) {
+      const id = 'chk_' + ent.name.replace(/[^a-z0-9]+/gi,'_');
+      const item = document.createElement('label');
+      item.className = 'entity-item';
+      item.setAttribute('for', id);
+
+      const chk = document.createElement('input');
+      chk.type = 'checkbox';
+      chk.id = id;
+      chk.checked = selected.has(ent.name);
+      chk.addEventListener('change', () => {
+        if (chk.checked) selected.add(ent.name); else selected.delete(ent.name);
+        scheduleRender();
+      });
+      checkboxByName.set(ent.name, chk);
+
+      const sw = document.createElement('span');
+      sw.className = 'swatch';
+      sw.style.background = ent.color;
+
+      const nm = document.createElement('span');
+      nm.className = 'entity-name';
+      nm.textContent = ent.name;
+
+      const ct = document.createElement('span');
+      ct.className = 'count';
+      ct.textContent = String(counts.get(ent.name) || 0);
+
+      item.appendChild(chk);
+      item.appendChild(sw);
+      item.appendChild(nm);
+      item.appendChild(ct);
+      listEl.appendChild(item);
+    }
+  }
+
+  function syncCheckboxes(){
+    for (const [name, chk] of checkboxByName) chk.checked = selected.has(name);
+  }
+
+  btnAll.addEventListener('click', () => {
+    selected.clear();
+    for (const ent of data.entities) selected.add(ent.name);
+    syncCheckboxes();
+    scheduleRender();
+  });
+  btnNone.addEventListener('click', () => {
+    selected.clear();
+    syncCheckboxes();
+    scheduleRender();
+  });
+
+  // Card markup comes from the <template> elements in the page; text is set
+  // through textContent, so nothing here needs HTML escaping.
+  function cloneTemplate(id){
+    return document.getElementById(id).content.firstElementChild.cloneNode(true);
+  }
+
+  function classFlags(ev){
+    let cls = '';
+    if (!ev.certain) cls += ' uncertain';
+    if (!ev.verified) cls += ' unverified';
+    return cls;
+  }
+  function buildSources(sources){
+    if (!sources || !sources.length) return null;
+    const group = cloneTemplate('tpl-sources');
+    const popover = group.querySelector('.source-popover');
+    for (const src of sources) {
+      const full = src.value || '';
+      let entry;
+      if (src.kind === 'url') {
+        entry = cloneTemplate('tpl-source-link');
+        entry.setAttribute('href', src.href || src.value || '');
+      } else {
+        entry = cloneTemplate('tpl-source-copy');
+        entry.setAttribute('data-copy-source', full);
+      }
+      entry.title = full;
+      entry.querySelector('.source-text').textContent = full;
+      popover.appendChild(entry);
+    }
+    return group;
+  }
+  function addEntityChips(hdr, ev, before){
+    for (const entName of ev._visible) {
+      const chip = document.createElement('span');
+      chip.className = 'ent';
+      chip.style.borderColor = colorOf.get(entName);
+      chip.textContent = entName;
+      hdr.insertBefore(chip, before);
+    }
+  }
+  function fillBody(card, ev){
+    const body = card.querySelector('.body');
+    // Long text is clipped by CSS, so the short and full body text are the same.
+    body.dataset.shortText = ev.desc;
+    body.dataset.fullText = ev.desc;
+    body.textContent = ev.desc;
+    card.querySelector('.tooltip').textContent = ev.desc;
+    const sources = buildSources(ev.sources);
+    if (sources) card.insertBefore(sources, card.querySelector('.tooltip'));
+  }
+  function fillDateTime(el, ev){
+    el.querySelector('.dt').textContent = ev.date_label;
+    el.querySelector('.tm').textContent = '\u00b7 ' + ev.time_label;
+  }
+  function closeAllSourcePopovers(except){
+    const groups = timelineEl.querySelectorAll('.sources.open');
+    for (const g of groups) {
+      if (except && g === except) continue;
+      g.classList.remove('open');
+    }
+  }
+  document.addEventListener('click', async (e) => {
+    const btn = e.target.closest('.source-copy[data-copy-source]');
+    if (!btn) return;
+    const value = btn.getAttribute('data-copy-source') || '';
+    try {
+      await navigator.clipboard.writeText(value);
+      btn.classList.add('copied');
+      window.setTimeout(() => btn.classList.remove('copied'), 500);
+    } catch (_) {}
+  });
+  document.addEventListener('click', (e) => {
+    const toggle = e.target.closest('.source-toggle');
+    if (toggle) {
+      e.preventDefault();
+      e.stopPropagation();
+      const group = toggle.closest('.sources');
+      if (!group) return;
+      const willOpen = !group.classList.contains('open');
+      closeAllSourcePopovers(group);
+      group.classList.toggle('open', willOpen);
+      return;
+    }
+    if (e.target.closest('.source-popover')) return;
+    closeAllSourcePopovers(null);
+  });
+  function updateBodyOverflowCues(){
+    const bodies = timelineEl.querySelectorAll('.body');
+    for (const body of bodies) {
+      const clipped = (body.scrollHeight - body.clientHeight) > 1;
+      body.classList.toggle('truncated', clipped);
+    }
+  }
+  let expandedEl = null;
+  function setBodyText(container, useFull){
+    const body = container.querySelector('.body');
+    if (!body) return;
+    body.textContent = useFull ? (body.dataset.fullText || body.textContent || '') : (body.dataset.shortText || body.textContent || '');
+  }
+  function collapseExpanded(){
+    if (!expandedEl) return;
+    setBodyText(expandedEl, false);
+    expandedEl.style.minHeight = '';
+    expandedEl.classList.remove('expanded');
+    expandedEl = null;
+    updateBodyOverflowCues();
+  }
+  timelineEl.addEventListener('click', (e) => {
+    if (e.target.closest('.source-link, .source-copy, .source-toggle, .source-popover')) return;
+    const target = e.target.closest('.range-wrap, .stack-item, .single-card');
+    if (!target || !timelineEl.contains(target)) return;
+    e.stopPropagation();
+    if (expandedEl === target) {
+      collapseExpanded();
+      return;
+    }
+    collapseExpanded();
+    setBodyText(target, true);
+    target.style.minHeight = target.getBoundingClientRect().height + 'px';
+    target.classList.add('expanded');
+    expandedEl = target;
+    updateBodyOverflowCues();
+  });
+  document.addEventListener('click', (e) => {
+    if (!expandedEl) return;
+    if (e.target.closest('.range-wrap, .stack-item, .single-card, .source-popover, .source-toggle')) return;
+    collapseExpanded();
+  });
+
+  // Core layout: slot-based vertical packing (not linear time)
+  function layout(events){
+    // events already filtered; keep only those with start_ms
+    const evs = events.slice().sort((a,b) => {
+      if (a.start_ms !== b.start_ms) return a.start_ms - b.start_ms;
+      // range first for same start
+      if (a.is_range !== b.is_range) return a.is_range ? -1 : 1;
+      // same start and kind: keep payload order, which is sorted by id text
+      return 0;
+    });
+
+    // slot by start time (millis) in sorted order (packed, not linear). One pass over
+    // the sorted events assigns slots and splits out ranges and per-slot normals;
+    // starts arrive in non-decreasing order and normals sharing a start already
+    // sit in id order.
+    const uniqueStarts = [];
+    const normalsBySlot = [];
+    const ranges = [];
+    for (const e of evs) {
+      if (!uniqueStarts.length || e.start_ms !== uniqueStarts[uniqueStarts.length - 1]) {
+        uniqueStarts.push(e.start_ms);
+        normalsBySlot.push([]);
+      }
+      e._slot = uniqueStarts.length - 1;
+      if (e.is_range) ranges.push(e); else normalsBySlot[e._slot].push(e);
+    }
+
+    // For each range event: find max slot among events whose start is within [start,end].
+    // Slots follow start order, so that is the last unique start <= end (binary search).
+    for (const r of ranges) {
+      let lo = 0, hi = uniqueStarts.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >>> 1;
+        if (uniqueStarts[mid] <= r.end_ms) lo = mid + 1; else hi = mid;
+      }
+      r._maxSlot = Math.max(r._slot, lo - 1);
+    }
+
+    // Assign wrapper columns to overlapping ranges (interval coloring, greedy)
+    const rangesSorted = ranges.slice().sort((a,b)=>{
+      if (a.start_ms !== b.start_ms) return a.start_ms - b.start_ms;
+      return a.end_ms - b.end_ms;
+    });
+    const colEnd = []; // end_ms per wrapper column
+    for (const r of rangesSorted) {
+      let col = -1;
+      for (let i = 0; i < colEnd.length; i++) {
+        // reuse column only if it ended strictly before this starts (inclusive overlap)
+        if (r.start_ms > colEnd[i]) { col = i; break; }
+      }
+      if (col === -1) {
+        col = colEnd.length;
+        colEnd.push(r.end_ms);
+      } else {
+        colEnd[col] = Math.max(colEnd[col], r.end_ms);
+      }
+      r._wrapCol = col;
+    }
+    const wrapCols = Math.max(1, colEnd.length);
+    const wrapArea = wrapCols * cfg.wrapColW + (wrapCols - 1) * cfg.gapX;
+
+    // Dynamic per-slot heights (because stacks can be taller than rowH)
+    const headerH = 34;      // approx stack header height
+    const itemH = 84;        // fixed subcard height target
+    const singleH = 84;      // single event card target (no nested subcard)
+    const itemGap = 10;      // matches CSS gap
+    const padH = 20;         // stack card padding top+bottom approx
+
+    const slotH = new Array(uniqueStarts.length).fill(cfg.rowH);
+
+    for (let i = 0; i < uniqueStarts.length; i++) {
+      const n = normalsBySlot[i].length;
+      if (n > 0) {
+        if (n === 1) {
+          slotH[i] = Math.max(slotH[i], singleH);
+        } else {
+          const stackH = headerH + padH + (n * itemH) + ((n - 1) * itemGap);
+          slotH[i] = Math.max(slotH[i], stackH);
+        }
+      }
+    }
+
+    // Ensure short range wrappers still have room for one line of body text + sources.
+    for (const r of ranges) {
+      if (r._slot === r._maxSlot) {
+        slotH[r._slot] = Math.max(slotH[r._slot], cfg.rangeMinH);
+      }
+    }
+
+    // Build yStart/yEnd per slot (cumulative)
+    const yStart = new Array(uniqueStarts.length).fill(0);
+    const yEnd = new Array(uniqueStarts.length).fill(0);
+    let yCursor = 0;
+    for (let i = 0; i < uniqueStarts.length; i++) {
+      yStart[i] = yCursor;
+      yEnd[i] = yCursor + slotH[i];
+      yCursor = yEnd[i] + cfg.rowGap;
+    }
+
+    // Compute final geometry
+    const positioned = [];
+
+    // Range wrappers: fixed left column, tall
+    for (const r of ranges) {
+      const y0 = yStart[r._slot];
+      const y1 = yEnd[r._maxSlot];
+      const y = y0;
+      const h = Math.max(cfg.rowH, (y1 - y0));
+      const x = (r._wrapCol || 0) * (cfg.wrapColW + cfg.gapX);
+      const w = cfg.wrapColW;
+      positioned.push({ kind:'range', ev:r, x, y, w, h });
+    }
+
+    // Normal cards: right side, in subcolumns
+    // Stacked cards (one per start_ms), on the right side
+    for (let slot = 0; slot < uniqueStarts.length; slot++) {
+      const arr = normalsBySlot[slot];
+      if (!arr.length) continue;
+      const y = yStart[slot];
+      const x = wrapArea + cfg.gapX;
+      const w = (cfg.subcolW * cfg.maxSubcols) + (cfg.gapX * (cfg.maxSubcols - 1));
+      const h = slotH[slot];
+      if (arr.length === 1) {
+        positioned.push({ kind:'single', ev: arr[0], x, y, w, h });
+      } else {
+        positioned.push({ kind:'stack', start_ms: uniqueStarts[slot], items: arr, x, y, w, h });
+      }
+    }
+
+    // Total height
+    const totalH = (yEnd.length ? (yEnd[yEnd.length - 1] + 40) : 400);
+    return { positioned, rangeCount: ranges.length, totalH, wrapArea };
+  }
+
+  // Cards by content key (kind, event ids and visible entities): those built for
+  // the previous render, and those built so far for the current one. A card
+  // whose key is unchanged is reused and only repositioned. Stack items are kept
+  // the same way, so a stack that gains or loses an event keeps the rest.
+  let nodeByKey = new Map();
+  let itemByKey = new Map();
+  let shownByKey = new Map();
+  let shownItemByKey = new Map();
+
+  function itemKey(ev){
+    return ev.id + ':' + ev._visible.join('|');
+  }
+
+  function barColor(ev){
+    return ev._visible.length ? colorOf.get(ev._visible[0]) : '#2f3e46';
+  }
+
+  function buildRange(e){
+    const div = cloneTemplate('tpl-range');
+    div.className += classFlags(e);
+    div.style.borderLeftColor = barColor(e);
+    const hdr = div.querySelector('.hdr');
+    addEntityChips(hdr, e, hdr.querySelector('.dt'));
+    fillDateTime(hdr, e);
+    fillBody(div, e);
+    return div;
+  }
+
+  function buildStack(items, keys, nextItemByKey){
+    const div = cloneTemplate('tpl-stack');
+    fillDateTime(div.querySelector('.stack-hdr'), items[0]);
+    const list = div.querySelector('.stack-items');
+    items.forEach((ev, i) => {
+      let item = itemByKey.get(keys[i]);
+      if (!item) {
+        item = cloneTemplate('tpl-stack-item');
+        item.className += classFlags(ev);
+        item.style.borderLeftColor = barColor(ev);
+        addEntityChips(item.querySelector('.hdr'), ev, null);
+        fillBody(item, ev);
+      }
+      nextItemByKey.set(keys[i], item);
+      list.appendChild(item);
+    });
+    return div;
+  }
+
+  function buildSingle(ev){
+    const div = cloneTemplate('tpl-single');
+    div.className += classFlags(ev);
+    div.style.borderLeftColor = barColor(ev);
+    const hdr = div.querySelector('.hdr');
+    addEntityChips(hdr, ev, hdr.querySelector('.dt'));
+    fillDateTime(hdr, ev);
+    fillBody(div, ev);
+    return div;
+  }
+
+  // Filtered events and layout of recently shown selections, so switching back
+  // to one skips the filter and layout passes. The oldest entry goes past 32.
+  const viewCache = new Map();
+
+  function selectionKey(){
+    let key = '';
+    for (const ent of data.entities) key += selected.has(ent.name) ? '1' : '0';
+    return key;
+  }
+
+  function filterEvents(){
+    // Mark the events of each selected entity, then collect them in their
+    // original order.
+    const mask = new Uint8Array(data.events.length);
+    for (const ent of selected) {
+      for (const i of eventsOf.get(ent)) mask[i] = 1;
+    }
+    const filtered = [];
+    for (let i = 0; i < mask.length; i++) {
+      if (mask[i]) filtered.push(data.events[i]);
+    }
+    return filtered;
+  }
+
+  // Filter changes within one frame are coalesced into a single render.
+  let renderScheduled = false;
+  function scheduleRender(){
+    if (renderScheduled) return;
+    renderScheduled = true;
+    requestAnimationFrame(() => {
+      renderScheduled = false;
+      render();
+    });
+  }
+
+  function render(){
+    const selKey = selectionKey();
+    let view = viewCache.get(selKey);
+    if (view) {
+      viewCache.delete(selKey);
+    } else {
+      const events = filterEvents();
+      view = { filtered: events, layout: events.length ? layout(events) : null };
+      if (viewCache.size >= 32) viewCache.delete(viewCache.keys().next().value);
+    }
+    viewCache.set(selKey, view);
+
+    // Each shown event's selected entities are resolved once here and reused
+    // for its card key, bar colour and entity chips.
+    const filtered = view.filtered;
+    for (const ev of filtered) {
+      ev._visible = ev.entities.filter(entName => selected.has(entName));
+    }
+
+    collapseExpanded();
+    nodeByKey = shownByKey;
+    itemByKey = shownItemByKey;
+    shownByKey = new Map();
+    shownItemByKey = new Map();
+    mountedSig = null;
+
+    if (!filtered.length) {
+      positioned = [];
+      rangeCount = 0;
+      cardAt = [];
+      const spine = timelineEl.querySelector('.spine');
+      const frag = document.createDocumentFragment();
+      if (spine) frag.appendChild(spine);
+      const empty = document.createElement('div');
+      empty.className = 'empty';
+      empty.textContent = 'No events selected.';
+      frag.appendChild(empty);
+      timelineEl.replaceChildren(frag);
+      timelineEl.style.height = 'auto';
+      return;
+    }
+
+    const { totalH, wrapArea } = view.layout;
+    positioned = view.layout.positioned;
+    rangeCount = view.layout.rangeCount;
+    cardAt = new Array(positioned.length);
+    timelineEl.style.height = totalH + 'px';
+    timelineEl.style.setProperty('--wrap-area', wrapArea + 'px');
+    mountVisible();
+  }
+
+  // Only cards within a screen of the viewport are in the document; the rest are
+  // built when scrolled near and dropped when scrolled away. The timeline keeps
+  // its full height, so the scrollbar is unaffected. Find-in-page only sees
+  // mounted cards, so small timelines mount everything, and so does any
+  // timeline once the find shortcut is used.
+  const mountAllUpTo = 400;
+  let mountAll = false;
+  let positioned = [];
+  let rangeCount = 0;
+  let cardAt = [];
+  let mountedSig = null;
+
+  function cardFor(i){
+    let div = cardAt[i];
+    if (div) return div;
+    const p = positioned[i];
+    const itemKeys = p.kind === 'stack' ? p.items.map(itemKey) : null;
+    const key = itemKeys ? 'stack:' + itemKeys.join(',') : p.kind + ':' + itemKey(p.ev);
+    div = nodeByKey.get(key);
+    if (!div) {
+      if (p.kind === 'range') div = buildRange(p.ev);
+      else if (p.kind === 'stack') div = buildStack(p.items, itemKeys, shownItemByKey);
+      else div = buildSingle(p.ev);
+    } else if (itemKeys) {
+      for (const k of itemKeys) shownItemByKey.set(k, itemByKey.get(k));
+    }
+    div.style.top = p.y + 'px';
+    div.style.left = p.x + 'px';
+    div.style.width = p.w + 'px';
+    div.style.height = p.h + 'px';
+    shownByKey.set(key, div);
+    cardAt[i] = div;
+    return div;
+  }
+
+  function mountVisible(){
+    if (!positioned.length) return;
+    const shown = mountAll || positioned.length <= mountAllUpTo
+      ? positioned.map((_, i) => i)
+      : nearViewport();
+
+    const sig = shown.join(',');
+    if (sig === mountedSig) return;
+    mountedSig = sig;
+
+    // The timeline's children (spine kept) are replaced in one step.
+    const spine = timelineEl.querySelector('.spine');
+    const frag = document.createDocumentFragment();
+    if (spine) frag.appendChild(spine);
+    for (const i of shown) frag.appendChild(cardFor(i));
+    timelineEl.replaceChildren(frag);
+    updateBodyOverflowCues();
+  }
+
+  function nearViewport(){
+    const viewH = window.innerHeight;
+    const top = -timelineEl.getBoundingClientRect().top - viewH;
+    const bottom = top + 3 * viewH;
+
+    // Range wrappers can be tall, so each is checked; the other cards follow
+    // each other down the page and are found by binary search.
+    const shown = [];
+    for (let i = 0; i < rangeCount; i++) {
+      const p = positioned[i];
+      if (p.y < bottom && p.y + p.h > top) shown.push(i);
+    }
+    let lo = rangeCount, hi = positioned.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (positioned[mid].y + positioned[mid].h > top) hi = mid; else lo = mid + 1;
+    }
+    for (let i = lo; i < positioned.length && positioned[i].y < bottom; i++) shown.push(i);
+    return shown;
+  }
+
+  let mountScheduled = false;
+  function scheduleMount(){
+    if (mountScheduled) return;
+    mountScheduled = true;
+    requestAnimationFrame(() => {
+      mountScheduled = false;
+      mountVisible();
+    });
+  }
+  window.addEventListener('scroll', scheduleMount, { passive: true });
+  window.addEventListener('resize', scheduleMount);
+  // Ctrl/Cmd+F and F3 reach the page before the browser's find bar opens.
+  window.addEventListener('keydown', (e) => {
+    const find = e.key === 'F3' || ((e.ctrlKey || e.metaKey) && e.key.toLowerCase() === 'f');
+    if (!find || mountAll) return;
+    mountAll = true;
+    mountVisible();
+  });
+
+  // Initial
+  renderSidebar();
+  render();
+})();"""
+
+_HEAD_HTML = "\n".join(
+    [
+        "<!DOCTYPE html>",
+        "<html lang='nl'>",
+        "<head>",
+        "<meta charset='utf-8' />",
+        "<meta name='viewport' content='width=device-width, initial-scale=1' />",
+        "<title>Vertical Timeline</title>",
+        "<style>",
+        _CSS_BLOCK,
+        "</style>",
+        "</head>",
+    ]
 )
 
+_BODY_HTML = """\
+<body>
+<div class='app'>
+  <aside class='sidebar'>
+    <div class='sidebar-inner'>
+      <h1 class='title'>Entities</h1>
+      <p class='sub'>Tick/untick entities to filter. The timeline reflows instantly.</p>
+      <div class='controls'>
+        <button class='btn' id='btn-all' type='button'>Select all</button>
+        <button class='btn' id='btn-none' type='button'>Select none</button>
+      </div>
+      <div class='entity-list' id='entity-list'></div>
+    </div>
+  </aside>
+  <main class='main'>
+    <div class='legend-top'>
+      <div class='chip'><span class='chip-box'></span> Zeker</div>
+      <div class='chip'><span class='chip-box uncertain'></span> Onzeker</div>
+      <div class='chip'><span class='chip-box unverified'></span> Ongeverifieerd</div>
+    </div>
+    <div class='viewport'>
+      <div class='timeline' id='timeline'>
+        <div class='spine'></div>
+      </div>
+    </div>
+  </main>
+</div>
+<template id='tpl-range'><div class='range-wrap'><div class='hdr'><span class='dt'></span><span class='tm'></span></div><div class='body'></div><div class='tooltip'></div></div></template>
+<template id='tpl-single'><div class='single-card'><div class='hdr'><span class='dt'></span><span class='tm'></span></div><div class='body'></div><div class='tooltip'></div></div></template>
+<template id='tpl-stack'><div class='stack-card'><div class='stack-hdr'><span class='dt'></span><span class='tm'></span></div><div class='stack-items'></div></div></template>
+<template id='tpl-stack-item'><div class='stack-item'><div class='hdr'></div><div class='body'></div><div class='tooltip'></div></div></template>
+<template id='tpl-sources'><div class='sources'><button class='source-toggle' type='button' title='Bronnen' aria-label='Bronnen'><span class='source-icon source-icon-sources' aria-hidden='true'></span></button><div class='source-popover'></div></div></template>
+<template id='tpl-source-link'><a class='source-entry source-link' target='_blank' rel='noopener noreferrer'><span class='source-icon source-icon-link' aria-hidden='true'></span><span class='source-text'></span></a></template>
+<template id='tpl-source-copy'><button class='source-entry source-copy' type='button'><span class='source-icon source-icon-file' aria-hidden='true'></span><span class='source-text'></span></button></template>"""
+
+_TAIL_HTML = "\n".join(["<script>", _JS_BLOCK, "</script>", "</body>", "</html>"])
+
+
 # -------------------------
 # Main
 # -------------------------
-def generate_vertical_timeline(excel_path: str | Path, output_path: str | Path) -> None:
-    base_events = read_events_from_excel(excel_path)
+def _build_payload_json(events: list[TimelineEvent]) -> str:
 
     # Build deterministic, dataset-local entity colours with strong hue separation.
     all_entities = {
         ent
-        for e in base_events
+        for e in events
         for ent in e.entities
     }
     entities_sorted = sorted(all_entities, key=lambda s: s.lower())
     entity_colors = build_entity_colors(entities_sorted)
 
-    # One event per row (keep multiple entities inside event)
-    events_payload = []
-    for e in base_events:
-        if e.start_dt is None:
-            continue
-
-        events_payload.append(
-            {
-                "id": str(e.event_id),
-                "entities": e.entities,
-                "colors": {ent: entity_colors[ent] for ent in e.entities},
-                "date_label": e.date_label,
-                "time_label": e.time_label,
-                "start_ms": int(pd.Timestamp(e.start_dt).value // 1_000_000),
-                "end_ms": int(pd.Timestamp(e.end_dt).value // 1_000_000) if e.end_dt else int(pd.Timestamp(e.start_dt).value // 1_000_000),
-                "is_range": is_range(e),
-                "certain": e.certain,
-                "verified": e.verified,
-                "desc_full": e.description,
-                "desc_short": e.description,
-                "sources": [
-                    {
-                        "kind": "url" if is_web_link(src) else "file",
-                        "value": src,
-                        "href": normalize_href(src) if is_web_link(src) else "",
-                    }
-                    for src in e.sources
-                ],
-            }
-        )
+    # Events go out as parallel columns (one list per field) rather than one object
+    # per event, so field names are not repeated for every row. Source lists repeat
+    # across events, so their payload pieces are built once per distinct list and
+    # shared. Labels and descriptions repeat too: each distinct string is sent once
+    # in "texts" and events refer to it by position.
+    text_ids: dict[str, int] = {}
+    sources_by_list: dict[tuple[str, ...], list[dict[str, str]]] = {}
+    # Events go out ordered by their id as text, the page's tiebreak for events
+    # sharing a start; its stable sort then needs no string comparisons.
+    timed_events = sorted(
+        (e for e in events if e.start_dt is not None), key=lambda e: str(e.event_id)
+    )
+    # Epoch milliseconds for all events in one conversion (floor division, like
+    # Timestamp.value // 1_000_000); a missing end falls back to the start.
+    start_us = np.array([e.start_dt for e in timed_events], dtype="datetime64[us]").view(np.int64)
+    end_us = np.array(
+        [e.end_dt or e.start_dt for e in timed_events], dtype="datetime64[us]"
+    ).view(np.int64)
+
+    # Events name their entities by position in the "entities" list. The inverted
+    # index (entity position -> event positions) lets the page filter by
+    # selection without scanning every event's entity list.
+    entity_number = {ent: number for number, ent in enumerate(entities_sorted)}
+    entity_index: list[list[int]] = [[] for _ in entities_sorted]
+    entities_column = []
+    sources_column = []
+    for position, e in enumerate(timed_events):
+        numbers = [entity_number[ent] for ent in e.entities]
+        for number in numbers:
+            entity_index[number].append(position)
+        entities_column.append(numbers)
+        sources_key = tuple(e.sources)
+        sources = sources_by_list.get(sources_key)
+        if sources is None:
+            sources = sources_by_list[sources_key] = [
+                {"kind": "url", "value": src, "href": normalize_href(src)}
+                if is_web_link(src)
+                else {"kind": "file", "value": src, "href": ""}
+                for src in e.sources
+            ]
+        sources_column.append(sources)
+
+    events_payload = {
+        "id": [str(e.event_id) for e in timed_events],
+        "entities": entities_column,
+        "date_label": [text_ids.setdefault(e.date_label, len(text_ids)) for e in timed_events],
+        "time_label": [text_ids.setdefault(e.time_label, len(text_ids)) for e in timed_events],
+        "start_ms": (start_us // 1000).tolist(),
+        "end_ms": (end_us // 1000).tolist(),
+        "is_range": [is_range(e) for e in timed_events],
+        "certain": [e.certain for e in timed_events],
+        "verified": [e.verified for e in timed_events],
+        "desc": [text_ids.setdefault(e.description, len(text_ids)) for e in timed_events],
+        "sources": sources_column,
+    }
 
     payload = {
         "entities": [
@@ -64,758 +1001,38 @@ def generate_vertical_timeline(excel_path: str | Path, output_path: str | Path)
             for ent in entities_sorted
         ],
         "events": events_payload,
+        "index": entity_index,
+        "texts": list(text_ids),
     }
 
-    payload_json = json.dumps(payload, ensure_ascii=False)
+    # The JSON sits inside a <script> element; "<" only occurs inside strings, and
+    # escaping it keeps text like "</script>" from ending the element early.
+    return _dumps(payload).replace("<", "\\u003c")
 
-    # HTML
-    html_parts = [
-        "<!DOCTYPE html>",
-        "<html lang='nl'>",
-        "<head>",
-        "<meta charset='utf-8' />",
-        "<meta name='viewport' content='width=device-width, initial-scale=1' />",
-        "<title>Vertical Timeline</title>",
-        "<style>",
-        "  :root {",
-        "    --bg: #ffffff;",
-        "    --ink: #2f3e46;",
-        "    --muted: rgba(47,62,70,0.55);",
-        "    --panel: rgba(47,62,70,0.04);",
-        "    --card: #f9fbfb;",
-        "    --range: #eef6f7;",
-        "    --sidebar-w: 320px;",
-        "    --wrap-col-w: 240px;",
-        "    --wrap-area: 0px; /* JS sets this to (#cols * colwidth + gaps) */",
-        "    --gap-x: 20px;",
-        "    --row-h: 98px;",
-        "    --range-min-h: 132px;",
-        "    --row-gap: 12px;",
-        "    --indent: 16px;",
-        "    --max-subcols: 4;",
-        "    --subcol-w: 340px;",
-        "  }",
-        "  body { font-family: 'Segoe UI', sans-serif; margin: 0; color: var(--ink); background: var(--bg); }",
-        "  .app { display: grid; grid-template-columns: var(--sidebar-w) 1fr; min-height: 100vh; }",
-        "",
-        "  /* Sidebar */",
-        "  .sidebar { position: sticky; top: 0; align-self: start; height: 100vh; overflow: auto;",
-        "    border-right: 2px solid rgba(47,62,70,0.12); background: #fff; }",
-        "  .sidebar-inner { padding: 16px 14px 18px; }",
-        "  .title { font-size: 16px; font-weight: 700; margin: 0 0 10px; }",
-        "  .sub { font-size: 12px; color: var(--muted); margin: 0 0 14px; line-height: 1.35; }",
-        "  .controls { display: flex; gap: 8px; margin-bottom: 12px; }",
-        "  .btn { border: 2px solid rgba(47,62,70,0.18); background: #fff; color: var(--ink);",
-        "    padding: 6px 10px; border-radius: 10px; cursor: pointer; font-weight: 600; font-size: 12px; }",
-        "  .btn:hover { background: rgba(47,62,70,0.04); }",
-        "  .entity-list { display: flex; flex-direction: column; gap: 6px; }",
-        "  .entity-item { display: flex; align-items: center; gap: 10px; padding: 6px 8px; border-radius: 10px; }",
-        "  .entity-item:hover { background: rgba(47,62,70,0.04); }",
-        "  .swatch { width: 14px; height: 14px; border-radius: 5px; border: 2px solid rgba(47,62,70,0.25); }",
-        "  .entity-name { font-size: 13px; font-weight: 600; overflow-wrap: anywhere; }",
-        "  .count { margin-left: auto; font-size: 12px; color: var(--muted); }",
-        "",
-        "  /* Main */",
-        "  .main { padding: 18px 18px 60px; }",
-        "  .legend-top { display: flex; gap: 18px; align-items: center; margin-bottom: 14px; }",
-        "  .chip { display: inline-flex; align-items: center; gap: 8px; font-size: 12px; }",
-        "  .chip-box { width: 18px; height: 12px; border: 2px solid var(--ink); border-radius: 4px; background: #fff; }",
-        "  .chip-box.uncertain { border-style: dashed; }",
-        "  .chip-box.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }",
-        "  .viewport { position: relative; }",
-        "  .timeline { position: relative; min-height: 400px; }",
-        "",
-        "  /* Range wrapper cards */",
-        "  .range-wrap { position: absolute; left: 0; width: var(--wrap-col-w);",
-        "    border: 2px solid var(--ink); border-left-width: 10px; border-radius: 18px;",
-        "    background: var(--range); box-sizing: border-box; padding: 10px 12px; overflow: hidden;",
-        "    display: flex; flex-direction: column; gap: 6px; cursor: pointer; }",
-        "  .range-wrap.uncertain { border-style: dashed; }",
-        "  .range-wrap.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }",
-        "  /* Normal cards (and also range header inside wrapper) */",
-        "  .card { position: absolute; border: 2px solid var(--ink); border-left-width: 10px; border-radius: 18px;",
-        "    background: var(--card); box-sizing: border-box; padding: 10px 12px; overflow: hidden; }",
-        "  .card.uncertain { border-style: dashed; }",
-        "  .card.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }",
-        "  .card:hover, .range-wrap:hover { overflow: visible; z-index: 500; }",
-        "  .sources { display: flex; gap: 6px; margin-top: 6px; }",
-        "  .source-link, .source-copy {",
-        "    width: 22px; height: 22px; border: 1px solid rgba(47,62,70,0.35); border-radius: 6px;",
-        "    background: #fff; display: inline-flex; align-items: center; justify-content: center;",
-        "    cursor: pointer; padding: 0; text-decoration: none;",
-        "  }",
-        "  .source-link:hover, .source-copy:hover { background: rgba(47,62,70,0.08); }",
-        "  .source-copy.copied { background: #dfeff2; }",
-        "  .source-icon { width: 12px; height: 12px; position: relative; display: inline-block; }",
-        "  .source-icon-link::before {",
-        "    content: ''; position: absolute; width: 8px; height: 8px; right: 1px; top: 1px;",
-        "    border-top: 2px solid #2f3e46; border-right: 2px solid #2f3e46;",
-        "  }",
-        "  .source-icon-link::after {",
-        "    content: ''; position: absolute; width: 7px; height: 2px; left: 1px; bottom: 2px;",
-        "    background: #2f3e46; transform: rotate(-45deg); transform-origin: left center;",
-        "  }",
-        "  .source-icon-file::before {",
-        "    content: ''; position: absolute; left: 1px; top: 1px; width: 8px; height: 10px;",
-        "    border: 2px solid #2f3e46; border-radius: 2px;",
-        "  }",
-        "  .source-icon-file::after {",
-        "    content: ''; position: absolute; right: 1px; top: 2px; width: 4px; height: 4px;",
-        "    border-top: 2px solid #2f3e46; border-right: 2px solid #2f3e46;",
-        "  }",
-        "",
-        "  /* Stacked (same-time) card */",
-        "  .stack-card {",
-        "    position: absolute;",
-        "    border: 2px solid var(--ink);",
-        "    border-left-width: 10px;",
-        "    border-left-color: #000;",
-        "    border-radius: 18px;",
-        "    background: var(--card);",
-        "    box-sizing: border-box;",
-        "    padding: 10px 12px;",
-        "    overflow: visible;",
-        "  }",
-        "  .stack-card:hover { overflow: visible; z-index: 500; }",
-        "",
-        "  .stack-hdr {",
-        "    display: flex;",
-        "    flex-wrap: wrap;",
-        "    gap: 10px;",
-        "    align-items: baseline;",
-        "    margin-bottom: 8px;",
-        "  }",
-        "",
-        "  .stack-items { display: flex; flex-direction: column; gap: 10px; }",
-
-        "  .single-card {",
-        "    position: absolute;",
-        "    border: 2px solid var(--ink);",
-        "    border-left-width: 10px;",
-        "    border-radius: 18px;",
-        "    background: var(--card);",
-        "    box-sizing: border-box;",
-        "    padding: 10px 12px;",
-        "    overflow: hidden;",
-        "    cursor: pointer;",
-        "  }",
-        "  .single-card.uncertain { border-style: dashed; }",
-        "  .single-card.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }",
-        "  .stack-item {",
-        "    border: 2px solid var(--ink);",
-        "    border-left-width: 10px;",
-        "    border-radius: 16px;",
-        "    background: #fff;",
-        "    box-sizing: border-box;",
-        "    padding: 8px 10px;",
-        "    position: relative;",
-        "    overflow: hidden;",
-        "    height: 84px;",
-        "    cursor: pointer;",
-        "  }",
-        "  .stack-item.uncertain { border-style: dashed; }",
-        "  .stack-item.unverified { border-style: dotted; border-color: #9aa0a6; background: #f2f3f5; }",
-        "  .stack-item:hover { overflow: visible; z-index: 600; }",
-        "",
-        "  .stack-item .body { margin-top: 6px; max-height: 2.6em; overflow: hidden; display: -webkit-box; -webkit-line-clamp: 2; -webkit-box-orient: vertical; }",
-        "  .stack-item .sources, .single-card .sources, .range-wrap .sources { position: absolute; right: 8px; top: 8px; margin-top: 0; }",
-        "  .hdr { display: flex; flex-wrap: wrap; gap: 10px; align-items: baseline; }",
-        "  .ent { font-weight: 800; font-size: 13px; padding: 2px 8px; border-radius: 999px; background: rgba(255,255,255,0.7);",
-        "    border: 2px solid rgba(47,62,70,0.15); }",
-        "  .dt { font-weight: 800; font-size: 13px; }",
-        "  .tm { font-weight: 700; font-size: 13px; color: rgba(47,62,70,0.85); }",
-        "  .body { margin-top: 6px; font-size: 13px; line-height: 1.25; max-height: 4.1em; overflow: hidden; position: relative; }",
-        "  .body.truncated::after {",
-        "    content: '?';",
-        "    position: absolute;",
-        "    right: 0;",
-        "    bottom: 0;",
-        "    width: 16px;",
-        "    text-align: right;",
-        "    font-size: 14px;",
-        "    font-weight: 700;",
-        "    color: rgba(47,62,70,0.78);",
-        "    background: linear-gradient(90deg, rgba(249,251,251,0), rgba(249,251,251,0.97) 48%);",
-        "  }",
-        "  .range-wrap .hdr { flex: 0 0 auto; }",
-        "  .range-wrap .body { flex: 1 1 auto; min-height: 0; max-height: none; overflow: hidden; margin-top: 0; }",
-        "  .range-wrap .sources { margin-top: auto; flex: 0 0 auto; }",
-        "",
-        "  .tooltip { display: none !important; position: absolute; left: 0; top: 100%; margin-top: 10px;",
-        "    max-width: 760px; padding: 10px 12px; border: 2px solid var(--ink); border-radius: 14px;",
-        "    background: #fff; box-shadow: 0 10px 26px rgba(0,0,0,0.12); font-size: 13px; line-height: 1.3; pointer-events: none; }",
-        "  .card:hover .tooltip, .range-wrap:hover .tooltip { display: none !important; }",
-        "  .stack-item:hover .tooltip { display: none !important; }",
-        "  .range-wrap.expanded, .stack-item.expanded, .single-card.expanded { overflow: visible; z-index: 1200; box-shadow: 0 10px 26px rgba(0,0,0,0.16); }",
-        "  .range-wrap.expanded { height: auto !important; }",
-        "  .stack-item.expanded { height: auto; }",
-        "  .single-card.expanded { height: auto !important; }",
-        "  .range-wrap.expanded .body, .stack-item.expanded .body, .single-card.expanded .body { max-height: none; overflow: visible; display: block; -webkit-line-clamp: unset; }",
-        "  .range-wrap.expanded .sources, .stack-item.expanded .sources, .single-card.expanded .sources { position: absolute; right: 8px; top: 8px; margin-top: 0; }",
-        "  .sources { position: absolute; right: 8px; top: 8px; z-index: 20; }",
-        "  .source-toggle {",
-        "    width: 22px; height: 22px; border: 1px solid rgba(47,62,70,0.35); border-radius: 6px;",
-        "    background: #fff; display: inline-flex; align-items: center; justify-content: center;",
-        "    cursor: pointer; padding: 0;",
-        "  }",
-        "  .source-toggle:hover { background: rgba(47,62,70,0.08); }",
-        "  .source-icon-sources::before {",
-        "    content: ''; position: absolute; left: 1px; top: 2px; width: 10px; height: 2px; background: #2f3e46;",
-        "    box-shadow: 0 3px 0 #2f3e46, 0 6px 0 #2f3e46;",
-        "  }",
-        "  .source-popover {",
-        "    display: none; position: absolute; right: 0; top: 28px; min-width: 280px; max-width: 520px; max-height: 260px; overflow: auto;",
-        "    padding: 8px; border: 2px solid var(--ink); border-radius: 12px; background: #fff; box-shadow: 0 10px 26px rgba(0,0,0,0.16);",
-        "  }",
-        "  .sources.open .source-popover { display: block; }",
-        "  .source-entry { display: flex; align-items: center; gap: 8px; padding: 5px 4px; }",
-        "  .source-text { font-size: 12px; line-height: 1.25; overflow-wrap: anywhere; }",
-        "  .source-popover .source-entry {",
-        "    width: auto; height: auto; border: 0; border-radius: 8px; background: transparent;",
-        "    justify-content: flex-start; padding: 6px 8px;",
-        "  }",
-        "  .source-popover .source-entry:hover { background: rgba(47,62,70,0.08); }",
-        "",
-        "  .timeline {",
-        "    position: relative;",
-        "    min-height: 400px;",
-        "    /* reserve real columns: wrapper + gap + event area */",
-        "    padding-left: 0;",
-        "  }",
-        "",
-        "  /* Nice divider line */",
-        "  .spine {",
-        "    position: absolute;",
-        "    left: calc(var(--wrap-area) + (var(--gap-x) / 2));",
-        "    top: 0;",
-        "    bottom: 0;",
-        "    width: 2px;",
-        "    background: rgba(47,62,70,0.10);",
-        "  }",
-        "  /* Small helper */",
-        "  .empty { color: var(--muted); font-size: 13px; padding: 40px 10px; }",
-        "</style>",
-        "</head>",
-        "<body>",
-        "<div class='app'>",
-        "  <aside class='sidebar'>",
-        "    <div class='sidebar-inner'>",
-        "      <h1 class='title'>Entities</h1>",
-        "      <p class='sub'>Tick/untick entities to filter. The timeline reflows instantly.</p>",
-        "      <div class='controls'>",
-        "        <button class='btn' id='btn-all' type='button'>Select all</button>",
-        "        <button class='btn' id='btn-none' type='button'>Select none</button>",
-        "      </div>",
-        "      <div class='entity-list' id='entity-list'></div>",
-        "    </div>",
-        "  </aside>",
-        "  <main class='main'>",
-        "    <div class='legend-top'>",
-        "      <div class='chip'><span class='chip-box'></span> Zeker</div>",
-        "      <div class='chip'><span class='chip-box uncertain'></span> Onzeker</div>",
-        "      <div class='chip'><span class='chip-box unverified'></span> Ongeverifieerd</div>",
-        "    </div>",
-        "    <div class='viewport'>",
-        "      <div class='timeline' id='timeline'>",
-        "        <div class='spine'></div>",
-        "      </div>",
-        "    </div>",
-        "  </main>",
-        "</div>",
-        f"<script id='data' type='application/json'>{payload_json}</script>",
-        "<script>",
-        "(function(){",
-        "  const data = JSON.parse(document.getElementById('data').textContent);",
-        "  const timelineEl = document.getElementById('timeline');",
-        "  const listEl = document.getElementById('entity-list');",
-        "  const btnAll = document.getElementById('btn-all');",
-        "  const btnNone = document.getElementById('btn-none');",
-        "",
-        "  const cfg = {",
-        "    rowH: cssNum('--row-h', 98),",
-        "    rangeMinH: cssNum('--range-min-h', 132),",
-        "    rowGap: cssNum('--row-gap', 12),",
-        "    gapX: cssNum('--gap-x', 20),",
-        "    wrapColW: cssNum('--wrap-col-w', 240),",
-        "    subcolW: cssNum('--subcol-w', 340),",
-        "    maxSubcols: Math.max(1, Math.floor(cssNum('--max-subcols', 4))),",
-        "    indent: cssNum('--indent', 16),",
-        "  };",
-        "",
-        "  function cssNum(varName, fallback){",
-        "    const v = getComputedStyle(document.documentElement).getPropertyValue(varName).trim();",
-        "    if (!v) return fallback;",
-        "    const n = parseFloat(v.replace('px',''));",
-        "    return Number.isFinite(n) ? n : fallback;",
-        "  }",
-        "",
-        "  // State: all selected by default",
-        "  const selected = new Set(data.entities.map(e => e.name));",
-        "",
-        "  // Sidebar UI",
-        "  function renderSidebar(counts){",
-        "    listEl.innerHTML = '';",
-        "    for (const ent of data.entities) {",
-        "      const id = 'chk_' + ent.name.replace(/[^a-z0-9]+/gi,'_');",
-        "      const item = document.createElement('label');",
-        "      item.className = 'entity-item';",
-        "      item.setAttribute('for', id);",
-        "",
-        "      const chk = document.createElement('input');",
-        "      chk.type = 'checkbox';",
-        "      chk.id = id;",
-        "      chk.checked = selected.has(ent.name);",
-        "      chk.addEventListener('change', () => {",
-        "        if (chk.checked) selected.add(ent.name); else selected.delete(ent.name);",
-        "        render();",
-        "      });",
-        "",
-        "      const sw = document.createElement('span');",
-        "      sw.className = 'swatch';",
-        "      sw.style.background = ent.color;",
-        "",
-        "      const nm = document.createElement('span');",
-        "      nm.className = 'entity-name';",
-        "      nm.textContent = ent.name;",
-        "",
-        "      const ct = document.createElement('span');",
-        "      ct.className = 'count';",
-        "      ct.textContent = String(counts.get(ent.name) || 0);",
-        "",
-        "      item.appendChild(chk);",
-        "      item.appendChild(sw);",
-        "      item.appendChild(nm);",
-        "      item.appendChild(ct);",
-        "      listEl.appendChild(item);",
-        "    }",
-        "  }",
-        "",
-        "  btnAll.addEventListener('click', () => {",
-        "    selected.clear();",
-        "    for (const ent of data.entities) selected.add(ent.name);",
-        "    render();",
-        "  });",
-        "  btnNone.addEventListener('click', () => {",
-        "    selected.clear();",
-        "    render();",
-        "  });",
-        "",
-        "  function escapeHtml(s){",
-        "    return String(s).replace(/[&<>\"']/g, (m) => ({'&':'&amp;','<':'&lt;','>':'&gt;','\"':'&quot;',\"'\":'&#39;'}[m] || m));",
-        "  }",
-        "",
-        "  function classFlags(ev){",
-        "    let cls = '';",
-        "    if (!ev.certain) cls += ' uncertain';",
-        "    if (!ev.verified) cls += ' unverified';",
-        "    return cls;",
-        "  }",
-        "  function renderSourcesHtml(sources){",
-        "    if (!sources || !sources.length) return '';",
-        "    const items = sources.map(src => {",
-        "      const full = escapeHtml(src.value || '');",
-        "      if (src.kind === 'url') {",
-        "        const href = escapeHtml(src.href || src.value || '');",
-        "        return `<a class='source-entry source-link' href='${href}' target='_blank' rel='noopener noreferrer' title='${full}'><span class='source-icon source-icon-link' aria-hidden='true'></span><span class='source-text'>${full}</span></a>`;",
-        "      }",
-        "      const val = escapeHtml(src.value || '');",
-        "      return `<button class='source-entry source-copy' type='button' data-copy-source='${val}' title='${full}'><span class='source-icon source-icon-file' aria-hidden='true'></span><span class='source-text'>${full}</span></button>`;",
-        "    }).join('');",
-        "    return `<div class='sources'><button class='source-toggle' type='button' title='Bronnen' aria-label='Bronnen'><span class='source-icon source-icon-sources' aria-hidden='true'></span></button><div class='source-popover'>${items}</div></div>`;",
-        "  }",
-        "  function closeAllSourcePopovers(except){",
-        "    const groups = timelineEl.querySelectorAll('.sources.open');",
-        "    for (const g of groups) {",
-        "      if (except && g === except) continue;",
-        "      g.classList.remove('open');",
-        "    }",
-        "  }",
-        "  document.addEventListener('click', async (e) => {",
-        "    const btn = e.target.closest('.source-copy[data-copy-source]');",
-        "    if (!btn) return;",
-        "    const value = btn.getAttribute('data-copy-source') || '';",
-        "    try {",
-        "      await navigator.clipboard.writeText(value);",
-        "      btn.classList.add('copied');",
-        "      window.setTimeout(() => btn.classList.remove('copied'), 500);",
-        "    } catch (_) {}",
-        "  });",
-        "  document.addEventListener('click', (e) => {",
-        "    const toggle = e.target.closest('.source-toggle');",
-        "    if (toggle) {",
-        "      e.preventDefault();",
-        "      e.stopPropagation();",
-        "      const group = toggle.closest('.sources');",
-        "      if (!group) return;",
-        "      const willOpen = !group.classList.contains('open');",
-        "      closeAllSourcePopovers(group);",
-        "      group.classList.toggle('open', willOpen);",
-        "      return;",
-        "    }",
-        "    if (e.target.closest('.source-popover')) return;",
-        "    closeAllSourcePopovers(null);",
-        "  });",
-        "  function updateBodyOverflowCues(){",
-        "    const bodies = timelineEl.querySelectorAll('.body');",
-        "    for (const body of bodies) {",
-        "      const clipped = (body.scrollHeight - body.clientHeight) > 1;",
-        "      body.classList.toggle('truncated', clipped);",
-        "    }",
-        "  }",
-        "  let expandedEl = null;",
-        "  function setBodyText(container, useFull){",
-        "    const body = container.querySelector('.body');",
-        "    if (!body) return;",
-        "    body.textContent = useFull ? (body.dataset.fullText || body.textContent || '') : (body.dataset.shortText || body.textContent || '');",
-        "  }",
-        "  function collapseExpanded(){",
-        "    if (!expandedEl) return;",
-        "    setBodyText(expandedEl, false);",
-        "    expandedEl.style.minHeight = '';",
-        "    expandedEl.classList.remove('expanded');",
-        "    expandedEl = null;",
-        "    updateBodyOverflowCues();",
-        "  }",
-        "  timelineEl.addEventListener('click', (e) => {",
-        "    if (e.target.closest('.source-link, .source-copy, .source-toggle, .source-popover')) return;",
-        "    const target = e.target.closest('.range-wrap, .stack-item, .single-card');",
-        "    if (!target || !timelineEl.contains(target)) return;",
-        "    e.stopPropagation();",
-        "    if (expandedEl === target) {",
-        "      collapseExpanded();",
-        "      return;",
-        "    }",
-        "    collapseExpanded();",
-        "    setBodyText(target, true);",
-        "    target.style.minHeight = target.getBoundingClientRect().height + 'px';",
-        "    target.classList.add('expanded');",
-        "    expandedEl = target;",
-        "    updateBodyOverflowCues();",
-        "  });",
-        "  document.addEventListener('click', (e) => {",
-        "    if (!expandedEl) return;",
-        "    if (e.target.closest('.range-wrap, .stack-item, .single-card, .source-popover, .source-toggle')) return;",
-        "    collapseExpanded();",
-        "  });",
-        "",
-        "  // Core layout: slot-based vertical packing (not linear time)",
-        "  function layout(events){",
-        "    // events already filtered; keep only those with start_ms",
-        "    const evs = events.slice().sort((a,b) => {",
-        "      if (a.start_ms !== b.start_ms) return a.start_ms - b.start_ms;",
-        "      // range first for same start",
-        "      if (a.is_range !== b.is_range) return a.is_range ? -1 : 1;",
-        "      // stable",
-        "      return a.id.localeCompare(b.id);",
-        "    });",
-        "",
-        "    // slot by start time (millis) in sorted order (packed, not linear)",
-        "    const slotOfId = new Map();",
-        "    const uniqueStarts = [];",
-        "    const byStart = new Map();",
-        "    for (const e of evs) {",
-        "      if (!byStart.has(e.start_ms)) { byStart.set(e.start_ms, []); uniqueStarts.push(e.start_ms); }",
-        "      byStart.get(e.start_ms).push(e);",
-        "    }",
-        "    uniqueStarts.sort((a,b)=>a-b);",
-        "    uniqueStarts.forEach((s, idx) => slotOfId.set(String(s), idx));",
-        "",
-        "    // slot index for each event (by start_ms)",
-        "    for (const e of evs) e._slot = slotOfId.get(String(e.start_ms));",
-        "",
-        "    // y positions per slot",
-        "",
-        "    // For each range event: find max slot among events whose start is within [start,end]",
-        "    const ranges = evs.filter(e => e.is_range);",
-        "    for (const r of ranges) {",
-        "      let maxSlot = r._slot;",
-        "      for (const e of evs) {",
-        "        if (e.start_ms >= r.start_ms && e.start_ms <= r.end_ms) {",
-        "          if (e._slot > maxSlot) maxSlot = e._slot;",
-        "        }",
-        "      }",
-        "      r._maxSlot = maxSlot;",
-        "    }",
-        "",
-        "    // Assign wrapper columns to overlapping ranges (interval coloring, greedy)",
-        "    const rangesSorted = ranges.slice().sort((a,b)=>{",
-        "      if (a.start_ms !== b.start_ms) return a.start_ms - b.start_ms;",
-        "      return a.end_ms - b.end_ms;",
-        "    });",
-        "    const colEnd = []; // end_ms per wrapper column",
-        "    for (const r of rangesSorted) {",
-        "      let col = -1;",
-        "      for (let i = 0; i < colEnd.length; i++) {",
-        "        // reuse column only if it ended strictly before this starts (inclusive overlap)",
-        "        if (r.start_ms > colEnd[i]) { col = i; break; }",
-        "      }",
-        "      if (col === -1) {",
-        "        col = colEnd.length;",
-        "        colEnd.push(r.end_ms);",
-        "      } else {",
-        "        colEnd[col] = Math.max(colEnd[col], r.end_ms);",
-        "      }",
-        "      r._wrapCol = col;",
-        "    }",
-        "    const wrapCols = Math.max(1, colEnd.length);",
-        "    const wrapArea = wrapCols * cfg.wrapColW + (wrapCols - 1) * cfg.gapX;",
-        "",
-        "    // Group NORMAL (non-range) events by start_ms => one stacked card per start time",
-        "    const normalByStart = new Map();",
-        "    for (const e of evs) {",
-        "      if (e.is_range) continue;",
-        "      if (!normalByStart.has(e.start_ms)) normalByStart.set(e.start_ms, []);",
-        "      normalByStart.get(e.start_ms).push(e);",
-        "    }",
-        "    for (const [k, arr] of normalByStart.entries()) {",
-        "      // stable order inside stack",
-        "      arr.sort((a,b)=>a.id.localeCompare(b.id));",
-        "    }",
-        "",
-        "    // Dynamic per-slot heights (because stacks can be taller than rowH)",
-        "    const headerH = 34;      // approx stack header height",
-        "    const itemH = 84;        // fixed subcard height target",
-        "    const singleH = 84;      // single event card target (no nested subcard)",
-        "    const itemGap = 10;      // matches CSS gap",
-        "    const padH = 20;         // stack card padding top+bottom approx",
-        "",
-        "    const slotStarts = uniqueStarts.slice();",
-        "    const slotH = new Array(slotStarts.length).fill(cfg.rowH);",
-        "",
-        "    for (let i = 0; i < slotStarts.length; i++) {",
-        "      const start = slotStarts[i];",
-        "      const n = (normalByStart.get(start) || []).length;",
-      "      if (n > 0) {",
-      "        if (n === 1) {",
-      "          slotH[i] = Math.max(slotH[i], singleH);",
-      "        } else {",
-      "          const stackH = headerH + padH + (n * itemH) + ((n - 1) * itemGap);",
-      "          slotH[i] = Math.max(slotH[i], stackH);",
-      "        }",
-      "      }",
-        "    }",
-        "",
-        "    // Ensure short range wrappers still have room for one line of body text + sources.",
-        "    for (const r of ranges) {",
-        "      if (r._slot === r._maxSlot) {",
-        "        slotH[r._slot] = Math.max(slotH[r._slot], cfg.rangeMinH);",
-        "      }",
-        "    }",
-        "",
-        "    // Build yStart/yEnd per slot (cumulative)",
-        "    const yStart = new Array(slotStarts.length).fill(0);",
-        "    const yEnd = new Array(slotStarts.length).fill(0);",
-        "    let yCursor = 0;",
-        "    for (let i = 0; i < slotStarts.length; i++) {",
-        "      yStart[i] = yCursor;",
-        "      yEnd[i] = yCursor + slotH[i];",
-        "      yCursor = yEnd[i] + cfg.rowGap;",
-        "    }",
-        "",
-        "    const yOfSlot = (slot) => yStart[slot] || 0;",
-        "    // Subcolumns for same-slot events (excluding range wrappers since they live in wrapper column)",
-        "    for (const start of uniqueStarts) {",
-        "      const group = byStart.get(start) || [];",
-        "      const normals = group.filter(e => !e.is_range);",
-        "      normals.sort((a,b)=>a.id.localeCompare(b.id));",
-        "      // if we overflow subrows, push them down within that same start time block",
-        "      // (we do it by extra y offset)",
-        "    }",
-        "",
-        "    // Compute final geometry",
-        "    const positioned = [];",
-        "",
-        "    // Range wrappers: fixed left column, tall",
-        "    for (const r of ranges) {",
-        "      const y0 = yStart[r._slot];",
-        "      const y1 = yEnd[r._maxSlot];",
-        "      const y = y0;",
-        "      const h = Math.max(cfg.rowH, (y1 - y0));",
-        "      const x = (r._wrapCol || 0) * (cfg.wrapColW + cfg.gapX);",
-        "      const w = cfg.wrapColW;",        
-        "      positioned.push({ kind:'range', ev:r, x, y, w, h });",
-        "    }",
-        "",
-        "    // Normal cards: right side, in subcolumns",
-        "    // Stacked cards (one per start_ms), on the right side",
-        "    for (const start of slotStarts) {",
-        "      const arr = normalByStart.get(start) || [];",
-        "      if (!arr.length) continue;",
-        "      const slot = slotOfId.get(String(start));",
-        "      const y = yStart[slot];",
-        "      const x = wrapArea + cfg.gapX;",
-        "      const w = (cfg.subcolW * cfg.maxSubcols) + (cfg.gapX * (cfg.maxSubcols - 1));",
-      "      const h = slotH[slot];",
-      "      if (arr.length === 1) {",
-      "        positioned.push({ kind:'single', ev: arr[0], x, y, w, h });",
-      "      } else {",
-      "        positioned.push({ kind:'stack', start_ms: start, items: arr, x, y, w, h });",
-      "      }",
-      "    }",
-        "",
-        "    // Total height",
-        "    let maxBottom = 0;",
-        "    for (const p of positioned) {",
-        "      maxBottom = Math.max(maxBottom, p.y + p.h);",
-        "    }",
-        "    const totalH = (yEnd.length ? (yEnd[yEnd.length - 1] + 40) : 400);",
-        "    return { positioned, totalH, wrapArea };",
-        "  }",
-        "",
-        "  function render(){",
-        "    // Filter",
-        "    const filtered = data.events.filter(e =>",
-        "      e.entities.some(ent => selected.has(ent))",
-        "    );",
-        "",
-        "    // Counts (for sidebar display)",
-        "    const counts = new Map();",
-        "    for (const e of data.events) {",
-        "      for (const ent of e.entities) {",
-        "        counts.set(ent, (counts.get(ent) || 0) + 1);",
-        "      }",
-        "    }",
-        "    renderSidebar(counts);",
-        "",
-        "    // Clear timeline (keep spine)",
-        "    const spine = timelineEl.querySelector('.spine');",
-        "    timelineEl.innerHTML = '';",
-        "    if (spine) timelineEl.appendChild(spine);",
-        "",
-        "    if (!filtered.length) {",
-        "      const empty = document.createElement('div');",
-        "      empty.className = 'empty';",
-        "      empty.textContent = 'No events selected.';",
-        "      timelineEl.appendChild(empty);",
-        "      timelineEl.style.height = 'auto';",
-        "      return;",
-        "    }",
-        "",
-        "    const { positioned, totalH, wrapArea } = layout(filtered);",
-        "    collapseExpanded();",
-        "    timelineEl.style.height = totalH + 'px';",
-        "    timelineEl.style.setProperty('--wrap-area', wrapArea + 'px');",
-        "",
-        "    for (const p of positioned) {",
-        "      if (p.kind === 'range') {",
-        "        const e = p.ev;",
-        "        const firstVisible = e.entities.find(ent => selected.has(ent));",
-        "        const color = firstVisible ? e.colors[firstVisible] : '#2f3e46';",
-        "        const cls = classFlags(e);",
-        "",
-        "        const div = document.createElement('div');",
-        "        div.className = 'range-wrap' + cls;",
-        "        div.style.top = p.y + 'px';",
-        "        div.style.left = p.x + 'px';",
-        "        div.style.width = p.w + 'px';",
-        "        div.style.height = p.h + 'px';",
-        "        div.style.borderLeftColor = color;",
-        "",
-        "        const ent = e.entities",
-        "          .filter(entName => selected.has(entName))",
-        "          .map(entName => {",
-        "            const c = e.colors[entName];",
-        "            return `<span class='ent' style='border-color: ${c};'>${escapeHtml(entName)}</span>`;",
-        "          })",
-        "          .join('');",
-        "        const hdr = `<div class='hdr'>${ent}<span class='dt'>${escapeHtml(e.date_label)}</span><span class='tm'>&middot; ${escapeHtml(e.time_label)}</span></div>`;",
-        "        const shortEsc = escapeHtml(e.desc_short);",
-        "        const fullEsc = escapeHtml(e.desc_full);",
-        "        const body = `<div class='body${e.desc_full !== e.desc_short ? ' has-more' : ''}' data-short-text='${shortEsc}' data-full-text='${fullEsc}'>${shortEsc}</div>`;",
-        "        const sources = renderSourcesHtml(e.sources);",
-        "        const tip = `<div class='tooltip'>${escapeHtml(e.desc_full)}</div>`;",
-        "        div.innerHTML = hdr + body + sources + tip;",
-        "        timelineEl.appendChild(div);",
-        "        continue;",
-        "      }",
-        "",
-        "      if (p.kind === 'stack') {",
-        "        const div = document.createElement('div');",
-        "        div.className = 'stack-card';",
-        "        div.style.top = p.y + 'px';",
-        "        div.style.left = p.x + 'px';",
-        "        div.style.width = p.w + 'px';",
-        "        div.style.height = p.h + 'px';",
-        "",
-        "        const first = p.items[0];",
-        "        const hdr = `<div class='stack-hdr'><span class='dt'>${escapeHtml(first.date_label)}</span><span class='tm'>&middot; ${escapeHtml(first.time_label)}</span></div>`;",
-        "",
-        "        const itemsHtml = p.items.map(ev => {",
-        "          const cls2 = classFlags(ev);",
-        "          const firstVisible2 = ev.entities.find(ent => selected.has(ent));",
-        "          const bar = firstVisible2 ? ev.colors[firstVisible2] : '#2f3e46';",
-        "          const ents = ev.entities",
-        "            .filter(entName => selected.has(entName))",
-        "            .map(entName => {",
-        "              const c = ev.colors[entName];",
-        "              return `<span class='ent' style='border-color: ${c};'>${escapeHtml(entName)}</span>`;",
-        "            })",
-        "            .join('');",
-        "          const sources2 = renderSourcesHtml(ev.sources);",
-        "          const tip = `<div class='tooltip'>${escapeHtml(ev.desc_full)}</div>`;",
-        "          return (",
-        "            `<div class='stack-item${cls2}' style='border-left-color: ${bar};'>` +",
-        "              `<div class='hdr'>${ents}</div>` +",
-        "              `<div class='body${ev.desc_full !== ev.desc_short ? ' has-more' : ''}' data-short-text='${escapeHtml(ev.desc_short)}' data-full-text='${escapeHtml(ev.desc_full)}'>${escapeHtml(ev.desc_short)}</div>` +",
-        "              sources2 +",
-        "              tip +",
-        "            `</div>`",
-        "          );",
-        "        }).join('');",
-        "",
-        "        div.innerHTML = hdr + `<div class='stack-items'>${itemsHtml}</div>`;",
-        "        timelineEl.appendChild(div);",
-        "        continue;",
-        "      }",
-        "",
-        "      if (p.kind === 'single') {",
-        "        const ev = p.ev;",
-        "        const cls2 = classFlags(ev);",
-        "        const firstVisible2 = ev.entities.find(ent => selected.has(ent));",
-        "        const bar = firstVisible2 ? ev.colors[firstVisible2] : '#2f3e46';",
-        "        const ents = ev.entities",
-        "          .filter(entName => selected.has(entName))",
-        "          .map(entName => {",
-        "            const c = ev.colors[entName];",
-        "            return `<span class='ent' style='border-color: ${c};'>${escapeHtml(entName)}</span>`;",
-        "          })",
-        "          .join('');",
-        "        const sources2 = renderSourcesHtml(ev.sources);",
-        "        const shortEsc2 = escapeHtml(ev.desc_short);",
-        "        const fullEsc2 = escapeHtml(ev.desc_full);",
-        "",
-        "        const div = document.createElement('div');",
-        "        div.className = 'single-card' + cls2;",
-        "        div.style.top = p.y + 'px';",
-        "        div.style.left = p.x + 'px';",
-        "        div.style.width = p.w + 'px';",
-        "        div.style.height = p.h + 'px';",
-        "        div.style.borderLeftColor = bar;",
-        "",
-        "        div.innerHTML =",
-        "          `<div class='hdr'>${ents}<span class='dt'>${escapeHtml(ev.date_label)}</span><span class='tm'>&middot; ${escapeHtml(ev.time_label)}</span></div>` +",
-        "          `<div class='body${ev.desc_full !== ev.desc_short ? ' has-more' : ''}' data-short-text='${shortEsc2}' data-full-text='${fullEsc2}'>${shortEsc2}</div>` +",
-        "          sources2 +",
-        "          `<div class='tooltip'>${fullEsc2}</div>`;",
-        "",
-        "        timelineEl.appendChild(div);",
-        "        continue;",
-        "      }",
-        "    }",
-        "    updateBodyOverflowCues();",
-        "  }",
-        "",
-        "  // Initial",
-        "  render();",
-        "})();",
-        "</script>",
-        "</body>",
-        "</html>",
-    ]
+
+def _iter_html_lines(payload_json: str) -> Iterator[str]:
+    # HTML, emitted piece by piece so callers can join or stream it
+    yield _HEAD_HTML
+    yield _BODY_HTML
+    yield f"<script id='data' type='application/json'>{payload_json}</script>"
+    yield _TAIL_HTML
+
+
+def build_vertical_html(events: list[TimelineEvent]) -> str:
+    return "\n".join(_iter_html_lines(_build_payload_json(events)))
+
+
+def generate_vertical_timeline(
+    excel_path: str | Path,
+    output_path: str | Path,
+    events: list[TimelineEvent] | None = None,
+) -> None:
+    if events is None:
+        events = read_events_from_excel(excel_path)
+    payload_json = _build_payload_json(events)
 
     output_path = Path(output_path)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.write_text("\n".join(html_parts), encoding="utf-8")
+    write_html_lines(output_path, _iter_html_lines(payload_json))
     print(f"Saved: {output_path.resolve()}")
 
 